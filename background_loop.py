@@ -0,0 +1,48 @@
+"""
+Shared asyncio event loop running in a single daemon thread.
+
+Used for deferred callbacks (LoopPlayer resume) and datagram endpoints
+(GazeReceiver) so that each feature does not spawn its own OS thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide background loop, starting it on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="background-loop", daemon=True
+            )
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def submit(coro: Coroutine[Any, Any, Any]) -> Future:
+    """Run a coroutine on the background loop; the Future is thread-safe."""
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+
+
+async def _call_later(delay: float, callback: Callable[[], None]) -> None:
+    await asyncio.sleep(delay)
+    callback()
+
+
+def call_later(delay: float, callback: Callable[[], None]) -> Future:
+    """Run callback after delay on the background loop; cancel() is thread-safe."""
+    return submit(_call_later(delay, callback))
+
+
+__all__ = ["get_background_loop", "submit", "call_later"]
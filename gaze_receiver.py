@@ -7,15 +7,63 @@
 # API:
 #   gr = GazeReceiver(host="127.0.0.1", port=5005)
 #   cmd = gr.get_command()   # démarre l'écoute si nécessaire, renvoie la commande fraîche ou None
+#   seq, cmd = gr.get_snapshot()  # idem + numéro de paquet (change à chaque réception)
 #   gr.ensure_started()      # optionnel: démarrer explicitement
 #   gr.stop()                # arrêter proprement
+#
+# Format binaire (optionnel, en plus du JSON) : datagramme de taille fixe
+#   struct "<2sBBdHiffff" = magic b"GZ", version 1, mode (0=idle, 1=track),
+#   ts (s, float64), ttl_ms (uint16), target_id (int32, -1 = aucun),
+#   neck yaw, eyeL yaw, eyeR yaw, (réservé) en degrés float32.
+# Le récepteur produit le même dict que pour le JSON équivalent.
 
+import asyncio
 import os
 import socket
 import json
+import struct
 import threading
 import time
-from typing import Optional
+from typing import Optional, Tuple
+
+from background_loop import get_background_loop, submit
+
+# orjson (optionnel) décode directement les bytes, sans .decode() intermédiaire
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover
+    orjson = None
+
+    def _loads(data):
+        return json.loads(bytes(data).decode("utf-8"))
+
+
+_BIN_MAGIC = b"GZ"
+_BIN_VERSION = 1
+_BIN_STRUCT = struct.Struct("<2sBBdHiffff")
+_BIN_MODES = ("idle", "track")
+
+
+def _decode(data):
+    """Décode un datagramme binaire (magic 'GZ') ou JSON."""
+    if len(data) == _BIN_STRUCT.size and data[:2] == _BIN_MAGIC:
+        (_, version, mode, ts, ttl_ms, target_id, neck, eye_l, eye_r, _) = (
+            _BIN_STRUCT.unpack_from(data)
+        )
+        if version != _BIN_VERSION:
+            raise ValueError(f"version binaire inconnue: {version}")
+        return {
+            "ts": ts,
+            "ttl_ms": ttl_ms,
+            "mode": _BIN_MODES[mode] if mode < len(_BIN_MODES) else "",
+            "target_id": target_id if target_id >= 0 else None,
+            "neck": {"yaw_deg": neck},
+            "eyeL": {"yaw_deg": eye_l},
+            "eyeR": {"yaw_deg": eye_r},
+        }
+    return _loads(data)
 
 
 def _is_flask_debug_parent() -> bool:
@@ -40,6 +88,36 @@ def _is_flask_debug_parent() -> bool:
     return False
 
 
+def _expiry(msg) -> float:
+    """
+    Calcule une fois par paquet l'instant d'expiration (ts + ttl_ms).
+    Sans 'ts', la commande reste fraîche (comportement historique).
+    """
+    if not msg or not isinstance(msg, dict):
+        return 0.0
+    if "ts" not in msg:
+        return float("inf")
+    ttl_ms = int(msg.get("ttl_ms", 250))
+    return float(msg["ts"]) + ttl_ms / 1000.0
+
+
+class _GazeProtocol(asyncio.DatagramProtocol):
+    """Publie les octets bruts ; seul le plus récent est décodé (à la lecture)."""
+
+    def __init__(self, receiver: "GazeReceiver"):
+        self._receiver = receiver
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        receiver = self._receiver
+        # seq incrémenté dans le seul thread de la boucle, publié avec le slot
+        receiver._seq += 1
+        receiver.latest = (data, receiver._seq)
+
+    def error_received(self, exc: Exception) -> None:
+        # ne pas faire tomber l'endpoint
+        print(f"[GazeReceiver] socket error: {exc}")
+
+
 class GazeReceiver:
     # Garde-fou: empêchez 2 démarrages dans LE MÊME process
     _started_in_process = False
@@ -52,12 +130,18 @@ class GazeReceiver:
         self.port = port
 
         self.sock: Optional[socket.socket] = None
-        self.thread: Optional[threading.Thread] = None
+        # Endpoint UDP servi par la boucle asyncio partagée (pas de thread dédié)
+        self._transport: Optional[asyncio.DatagramTransport] = None
         self.running = threading.Event()
         self.running.clear()
 
-        self.latest = None
-        self.lock = threading.Lock()
+        # Slot unique (octets bruts, seq) : une seule affectation de référence,
+        # atomique sous le GIL, donc pas de verrou producteur/consommateur.
+        # Une rafale de paquets entre deux lectures ne coûte qu'un décodage.
+        self.latest: Optional[tuple] = None
+        self._seq = 0
+        # Cache du dernier décodage : (seq, msg, expires_at)
+        self._decoded: tuple = (0, None, 0.0)
 
         # Si on est dans le parent du reloader Flask -> démarrage différé (pas de bind ici)
         self._deferred = _is_flask_debug_parent()
@@ -66,7 +150,7 @@ class GazeReceiver:
             self.ensure_started()
 
     def ensure_started(self):
-        """Démarre le bind + thread de réception si ce n'est pas déjà fait dans CE process."""
+        """Démarre le bind + l'endpoint de réception si ce n'est pas déjà fait dans CE process."""
         if self.running.is_set():
             return
 
@@ -94,72 +178,71 @@ class GazeReceiver:
 
             self.sock.setblocking(False)
 
-            # Thread de réception
+            # Endpoint asyncio sur la socket déjà bindée
+            loop = get_background_loop()
+            self._transport, _ = submit(
+                loop.create_datagram_endpoint(
+                    lambda: _GazeProtocol(self), sock=self.sock
+                )
+            ).result(timeout=5.0)
             self.running.set()
-            self.thread = threading.Thread(target=self._loop, daemon=True)
-            self.thread.start()
 
             GazeReceiver._started_in_process = True
 
-    def _loop(self):
-        while self.running.is_set():
-            try:
-                data, _ = self.sock.recvfrom(8192)
-                if not data:
-                    time.sleep(0.01)
-                    continue
-                try:
-                    msg = json.loads(data.decode("utf-8"))
-                except Exception:
-                    time.sleep(0.005)
-                    continue
-                with self.lock:
-                    self.latest = msg
-            except BlockingIOError:
-                time.sleep(0.01)
-            except Exception as e:
-                # ne pas faire crasher le thread
-                print(f"[GazeReceiver] socket error: {e}")
-                time.sleep(0.1)
-
     def get_command(self):
         """
         Retourne la dernière commande fraîche (selon ttl_ms), sinon None.
         Démarre l'écoute à la volée si elle était différée.
         """
+        return self.get_snapshot()[1]
+
+    def get_snapshot(self) -> Tuple[int, Optional[dict]]:
+        """
+        (seq, commande fraîche ou None). seq change à chaque paquet reçu : un
+        consommateur peut ne réinterpréter la commande que quand il change.
+        """
         if not self.running.is_set() and not self._deferred:
             # cas: autostart=False -> on démarre à la demande
             self.ensure_started()
         elif self._deferred:
             # On était dans le parent Flask; on ne doit pas écouter ici.
             # Retourne None proprement (le worker fera l'écoute).
-            return None
-
-        with self.lock:
-            cmd = self.latest
-
-        if not cmd:
-            return None
-
-        now = time.time()
-        ts = float(cmd.get("ts", now))
-        ttl_ms = int(cmd.get("ttl_ms", 250))
-        if now - ts > (ttl_ms / 1000.0):
-            return None
+            return 0, None
+
+        slot = self.latest
+        if slot is None:
+            return 0, None
+        data, seq = slot
+        decoded = self._decoded
+        if decoded[0] != seq:
+            try:
+                msg = _decode(data)
+                decoded = (seq, msg, _expiry(msg))
+            except Exception:
+                # paquet invalide : on garde la dernière commande valide
+                decoded = (seq, decoded[1], decoded[2])
+            self._decoded = decoded
+        _, cmd, expires_at = decoded
+        if not cmd or time.time() > expires_at:
+            return seq, None
 
-        return cmd
+        return seq, cmd
 
     def stop(self, timeout: float = 1.0):
         self.running.clear()
-        try:
-            if self.thread and self.thread.is_alive():
-                self.thread.join(timeout=timeout)
-        except Exception:
-            pass
-        try:
-            if self.sock:
+        transport = self._transport
+        self._transport = None
+        if transport is not None:
+            # close() ferme aussi la socket ; à faire depuis la boucle
+            try:
+                get_background_loop().call_soon_threadsafe(transport.close)
+            except Exception:
+                pass
+        elif self.sock:
+            try:
                 self.sock.close()
-        finally:
-            self.sock = None
+            except Exception:
+                pass
+        self.sock = None
         with self._class_lock:
             GazeReceiver._started_in_process = False
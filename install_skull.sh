@@ -6,6 +6,9 @@ INSTALL_DIR="/opt/skull"
 SERVICE_NAME="servo-sync.service"
 PLAYLIST_SERVICE_NAME="playlist-web.service"
 
+# I2C bus speed for the PCA9685 (Hz), applied via dtparam=i2c_arm_baudrate
+I2C_BAUDRATE=400000
+
 # APT packages required because they cannot be installed via pip
 APT_PACKAGES=(
   git
@@ -194,6 +197,9 @@ adafruit-blinka>=8.0.0,<9.0.0
 numpy
 soundfile
 sounddevice
+orjson
+soxr
+waitress
 EOF
   chown "$SKULL_USER:$SKULL_GROUP" "$INSTALL_DIR/requirements.txt"
 }
@@ -552,6 +558,14 @@ enable_i2c() {
     fi
   fi
 
+  # Fast-mode (400 kHz) : le noyau fixe la vitesse du bus, pas Python
+  if grep -Eq '^[[:space:]]*dtparam=i2c_arm_baudrate=' /boot/config.txt; then
+    msg "Vitesse I2C deja configuree dans /boot/config.txt."
+  else
+    msg "Bus I2C a ${I2C_BAUDRATE} Hz (dtparam=i2c_arm_baudrate, effectif au prochain redemarrage)"
+    printf '\ndtparam=i2c_arm_baudrate=%s\n' "$I2C_BAUDRATE" >> /boot/config.txt
+  fi
+
   if [[ -f /etc/modules ]] && ! grep -Eq '^[[:space:]]*i2c-dev' /etc/modules; then
     msg "Ajout du module i2c-dev dans /etc/modules"
     printf 'i2c-dev\n' >> /etc/modules
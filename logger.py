@@ -3,13 +3,197 @@ Système de logging pour les commandes servo et analyse de synchronisation.
 Crée des logs détaillés avec timestamps et statistiques de performance.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional
 import json
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+@dataclass(frozen=True, slots=True)
+class ServoCommandSnapshot:
+    """Colonnes d'un ServoCommandBuffer lues à la même longueur, sous son verrou."""
+
+    timestamps: np.ndarray
+    elapsed: np.ndarray
+    angles: np.ndarray
+    enabled: np.ndarray
+    servo_ids: np.ndarray
+    servo_names: List[str]
+
+    def __len__(self) -> int:
+        return self.timestamps.shape[0]
+
+
+class ServoCommandBuffer:
+    """
+    Stockage colonne (SoA) des commandes servo d'une session : tableaux NumPy
+    préalloués au lieu d'un dict Python par commande. La capacité double
+    quand elle est atteinte, aucune commande n'est perdue.
+    """
+
+    def __init__(self, capacity: int = 8192):
+        self._lock = threading.Lock()
+        self._n = 0
+        self._alloc(max(1, int(capacity)))
+        self.servo_names: List[str] = []
+        self._servo_ids: Dict[str, int] = {}
+
+    def _alloc(self, capacity: int) -> None:
+        n = self._n
+        ts = np.empty(capacity, dtype=np.float64)
+        elapsed = np.empty(capacity, dtype=np.float64)
+        angle = np.empty(capacity, dtype=np.float32)
+        enabled = np.empty(capacity, dtype=np.bool_)
+        servo = np.empty(capacity, dtype=np.int16)
+        if n:
+            ts[:n] = self._ts[:n]
+            elapsed[:n] = self._elapsed[:n]
+            angle[:n] = self._angle[:n]
+            enabled[:n] = self._enabled[:n]
+            servo[:n] = self._servo[:n]
+        self._ts = ts
+        self._elapsed = elapsed
+        self._angle = angle
+        self._enabled = enabled
+        self._servo = servo
+
+    def append(
+        self,
+        timestamp: float,
+        elapsed: float,
+        servo_name: str,
+        angle: float,
+        enabled: bool,
+    ) -> None:
+        servo_id = self._servo_ids.get(servo_name)
+        with self._lock:
+            if servo_id is None:
+                servo_id = self._servo_ids.setdefault(
+                    servo_name, len(self.servo_names)
+                )
+                if servo_id == len(self.servo_names):
+                    self.servo_names.append(servo_name)
+            i = self._n
+            if i == self._ts.shape[0]:
+                self._alloc(i * 2)
+            self._ts[i] = timestamp
+            self._elapsed[i] = elapsed
+            self._angle[i] = angle
+            self._enabled[i] = enabled
+            self._servo[i] = servo_id
+            self._n = i + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def snapshot(self) -> ServoCommandSnapshot:
+        """
+        Vue cohérente des colonnes : n lu une seule fois sous le verrou, alors
+        que les propriétés ci-dessous relisent chacune _n (un append concurrent
+        peut les désaligner).
+        """
+        with self._lock:
+            n = self._n
+            return ServoCommandSnapshot(
+                timestamps=self._ts[:n],
+                elapsed=self._elapsed[:n],
+                angles=self._angle[:n],
+                enabled=self._enabled[:n],
+                servo_ids=self._servo[:n],
+                servo_names=list(self.servo_names),
+            )
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._ts[: self._n]
+
+    @property
+    def elapsed(self) -> np.ndarray:
+        return self._elapsed[: self._n]
+
+    @property
+    def angles(self) -> np.ndarray:
+        return self._angle[: self._n]
+
+    @property
+    def enabled(self) -> np.ndarray:
+        return self._enabled[: self._n]
+
+    @property
+    def servo_ids(self) -> np.ndarray:
+        return self._servo[: self._n]
+
+
+# Notifiée par le thread d'écriture après chaque flush (suivi temps réel des logs)
+_log_written = threading.Condition()
+
+
+class _ServoQueueListener(logging.handlers.QueueListener):
+    """
+    Thread d'écriture unique du fichier de log. Accepte des LogRecord
+    (QueueHandler) et des tuples bruts de commande servo (chemin rapide),
+    formatés ici : l'ordre des lignes est gardé et le formatage comme les IO
+    disque sortent des threads temps réel.
+    """
+
+    # Préfixe horaire "HH:MM:SS" mis en cache, recalculé une fois par seconde
+    _ts_sec: int = -1
+    _ts_prefix: str = ""
+
+    def _format_servo(self, record: tuple) -> str:
+        """Même format que le Formatter du fichier, sans LogRecord ni '%'."""
+        now, elapsed, servo_name, angle, enabled = record
+        sec = int(now)
+        if sec != self._ts_sec:
+            self._ts_sec = sec
+            self._ts_prefix = time.strftime("%H:%M:%S", time.localtime(sec))
+        msecs = int((now - sec) * 1000)
+        status = "ACTIVE" if enabled else "FROZEN"
+        return (
+            f"{self._ts_prefix}.{msecs:03d} | "
+            f"SERVO | {elapsed:7.3f}s | {servo_name:10} | {angle:6.1f}° | {status}\n"
+        )
+
+    def handle(self, record) -> None:
+        if isinstance(record, tuple):
+            record = self._format_servo(record)
+        if not isinstance(record, str):
+            super().handle(record)
+        else:
+            for handler in self.handlers:
+                handler.acquire()
+                try:
+                    stream = handler.stream
+                    if stream is None:
+                        stream = handler.stream = handler._open()
+                    stream.write(record)
+                    # flush groupé : une fois la rafale écoulée
+                    if self.queue.empty():
+                        stream.flush()
+                finally:
+                    handler.release()
+        if self.queue.empty():
+            with _log_written:
+                _log_written.notify_all()
+
 
 class ServoLogger:
     def __init__(self, log_dir: str = "logs"):
@@ -20,6 +204,8 @@ class ServoLogger:
         self.logger = logging.getLogger("servo_commands")
         self.logger.setLevel(logging.INFO)
 
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
         # Éviter les doublons de handlers
         if not self.logger.handlers:
             # Handler pour fichier avec rotation
@@ -34,16 +220,84 @@ class ServoLogger:
                 "%(asctime)s.%(msecs)03d | %(message)s", datefmt="%H:%M:%S"
             )
             file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+
+            # Les appelants ne font qu'enfiler ; un thread dédié écrit le fichier
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            self.logger.addHandler(queue_handler)
+            listener = _ServoQueueListener(log_queue, file_handler)
+            listener.start()
+            self._listener = listener
+            atexit.register(
+                self._stop_listener, listener, queue_handler, file_handler
+            )
+
+        # Arrêt du listener : une seule fois, même si appelé plusieurs fois
+        self._stop_lock = threading.Lock()
+        self._listener_stopped = False
+        # File partagée par le chemin rapide des commandes servo
+        self._log_queue: Optional[queue.SimpleQueue] = next(
+            (
+                h.queue
+                for h in self.logger.handlers
+                if isinstance(h, logging.handlers.QueueHandler)
+            ),
+            None,
+        )
+        # Date du fichier de log courant, revérifiée au plus une fois par minute
+        self._date_stamp: str = ""
+        self._date_checked_at: float = 0.0
+        self._log_file_path: Optional[Path] = None
 
         # Tracking pour analyse
         self.session_start_time: Optional[float] = None
         self.audio_start_time: Optional[float] = None
         self.audio_duration: Optional[float] = None
         self.last_servo_command_time: Optional[float] = None
-        self.servo_commands: List[Dict] = []
+        self.servo_commands = ServoCommandBuffer()
         self.current_session: Optional[str] = None
 
+    def _stop_listener(
+        self,
+        listener: logging.handlers.QueueListener,
+        queue_handler: logging.Handler,
+        file_handler: logging.Handler,
+    ) -> None:
+        """
+        À la sortie : rebranche le FileHandler en direct, pour que les logs émis
+        pendant l'arrêt (ex: __del__) restent écrits, puis vide la file.
+        Idempotent : un second appel ne fait rien.
+        """
+        with self._stop_lock:
+            if self._listener_stopped:
+                return
+            self._listener_stopped = True
+            log_queue = self._log_queue
+            # Plus de nouvel enfilage : le chemin rapide passe au log direct
+            self._log_queue = None
+            self.logger.addHandler(file_handler)
+            self.logger.removeHandler(queue_handler)
+            listener.stop()
+            if log_queue is not None:
+                self._drain_queue(listener, log_queue)
+            file_handler.flush()
+
+    @staticmethod
+    def _drain_queue(listener, log_queue: queue.SimpleQueue) -> None:
+        """Écrit ce qui a été enfilé après la sentinelle d'arrêt du listener."""
+        while True:
+            try:
+                record = log_queue.get_nowait()
+            except queue.Empty:
+                return
+            if record is not None:
+                listener.handle(record)
+
+    def wait_for_write(self, timeout: float) -> bool:
+        """Bloque jusqu'au prochain flush du fichier de log ; False si timeout."""
+        with _log_written:
+            return _log_written.wait(timeout)
+
     def start_session(self, session_name: str, audio_duration: float):
         """Démarre une nouvelle session de logging"""
         self.current_session = session_name
@@ -70,18 +324,21 @@ class ServoLogger:
             elapsed = 0.0
 
         # Enregistrer pour analyse
-        command_data = {
-            "timestamp": current_time,
-            "elapsed_audio": elapsed,
-            "servo": servo_name,
-            "angle": angle,
-            "enabled": enabled,
-        }
-        self.servo_commands.append(command_data)
+        self.servo_commands.append(current_time, elapsed, servo_name, angle, enabled)
 
         if enabled:
             self.last_servo_command_time = current_time
 
+        # Chemin rapide : un tuple brut, formaté par le thread du listener
+        log_queue = self._log_queue
+        if log_queue is not None and self.logger.isEnabledFor(logging.INFO):
+            log_queue.put((current_time, elapsed, servo_name, angle, enabled))
+            if self._log_queue is None and self._listener is not None:
+                # listener arrêté entre-temps : écrire nous-mêmes le reliquat
+                with self._stop_lock:
+                    self._drain_queue(self._listener, log_queue)
+            return
+
         # Log formaté
         status = "ACTIVE" if enabled else "FROZEN"
         self.logger.info(
@@ -149,6 +406,8 @@ class ServoLogger:
 
     def _calculate_stats(self, session_end_time: float) -> Dict:
         """Calcule les statistiques de synchronisation"""
+        # Le thread du suiveur de regard peut encore ajouter des commandes
+        commands = self.servo_commands.snapshot()
         stats = {
             "session_name": self.current_session,
             "total_session_duration": (
@@ -160,15 +419,14 @@ class ServoLogger:
             "actual_audio_duration": 0,
             "audio_drift": 0,
             "last_servo_delay": None,
-            "total_commands": len(self.servo_commands),
+            "total_commands": len(commands),
             "commands_per_second": 0,
             "servo_stats": {},
         }
 
-        if self.servo_commands and self.audio_start_time:
+        if len(commands) and self.audio_start_time:
             # Durée audio réelle (approximation basée sur le dernier timestamp)
-            last_command = max(self.servo_commands, key=lambda x: x["elapsed_audio"])
-            stats["actual_audio_duration"] = last_command["elapsed_audio"]
+            stats["actual_audio_duration"] = float(commands.elapsed.max())
 
             # Dérive audio
             stats["audio_drift"] = (
@@ -191,15 +449,18 @@ class ServoLogger:
                 )
 
             # Stats par servo
+            names = commands.servo_names
+            ids = commands.servo_ids
+            enabled = commands.enabled
+            nb = len(names)
+            active = np.bincount(ids[enabled], minlength=nb)
+            frozen = np.bincount(ids[~enabled], minlength=nb)
             servo_counts = {}
-            for cmd in self.servo_commands:
-                servo = cmd["servo"]
-                if servo not in servo_counts:
-                    servo_counts[servo] = {"active": 0, "frozen": 0}
-                if cmd["enabled"]:
-                    servo_counts[servo]["active"] += 1
-                else:
-                    servo_counts[servo]["frozen"] += 1
+            for servo_id in np.unique(ids).tolist():
+                servo_counts[names[servo_id]] = {
+                    "active": int(active[servo_id]),
+                    "frozen": int(frozen[servo_id]),
+                }
             stats["servo_stats"] = servo_counts
 
         return stats
@@ -239,20 +500,36 @@ class ServoLogger:
 
     def _save_session_stats(self, stats: Dict):
         """Sauvegarde les stats de session en JSON"""
-        stats_file = (
-            self.log_dir
-            / f"session_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        )
+        now = datetime.now()
+        stats_file = self.log_dir / f"session_stats_{now.strftime('%Y%m%d_%H%M%S')}.json"
 
         # Ajouter timestamp pour le nom de fichier
-        stats["timestamp"] = datetime.now().isoformat()
+        stats["timestamp"] = now.isoformat()
+
+        if orjson is not None:
+            payload = orjson.dumps(
+                stats,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_SERIALIZE_NUMPY,
+            )
+            with open(stats_file, "wb") as f:
+                f.write(payload)
+            return
 
         with open(stats_file, "w", encoding="utf-8") as f:
             json.dump(stats, f, indent=2, ensure_ascii=False)
 
     def get_latest_log_file(self) -> Path:
         """Retourne le chemin du fichier de log actuel"""
-        return self.log_dir / f"servo_commands_{datetime.now().strftime('%Y%m%d')}.log"
+        now = time.time()
+        if self._log_file_path is None or now - self._date_checked_at > 60:
+            self._date_checked_at = now
+            stamp = datetime.now().strftime("%Y%m%d")
+            if stamp != self._date_stamp or self._log_file_path is None:
+                self._date_stamp = stamp
+                self._log_file_path = self.log_dir / f"servo_commands_{stamp}.log"
+        return self._log_file_path
 
 
 # Instance globale
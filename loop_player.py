@@ -14,8 +14,11 @@ Modifications:
 
 from __future__ import annotations
 
+import json
+import os
 import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Any, Optional
 
@@ -23,11 +26,23 @@ import numpy as np
 import sounddevice as sd
 import soundfile as sf
 
+try:
+    import soxr
+except ImportError:  # pragma: no cover
+    soxr = None
+
+from background_loop import call_later
 from logger import servo_logger
 
 # Fixed loop file (WAV) used exclusively.
 LOOP_WAV_PATH = Path("/opt/skull/data/boucle.wav")
 
+# Raw float32 PCM sidecar (+ JSON header) memory-mapped instead of decoding
+# the WAV into a private array on every load. The sidecar holds the loop
+# followed by a copy of its first frames, so a block never has to wrap.
+LOOP_PCM_SUFFIX = ".f32"
+LOOP_PCM_HEADER_SUFFIX = ".f32.json"
+
 
 class LoopPlayer:
     """Lightweight gapless audio looper with fade support using a fixed WAV source."""
@@ -50,8 +65,11 @@ class LoopPlayer:
         self.blocksize = int(blocksize)
         self.latency = latency
 
-        # Playback/loop state (protected by _lock)
-        self._lock = threading.RLock()
+        # Control state (protected by _lock). The audio callback never takes this
+        # lock: it only reads plain attributes, which are atomic in CPython.
+        self._lock = threading.Lock()
+        # Serializes WAV decodes (and their sidecar writes); never held with _lock
+        self._decode_lock = threading.Lock()
         self._loop: Optional[np.ndarray] = None  # float32, shape (N, C)
         self._sr: Optional[int] = None
         self._channels: Optional[int] = None
@@ -64,15 +82,27 @@ class LoopPlayer:
         # User volume (0..1), separated from runtime fade volume
         self._user_gain: float = 1.0  # <-- NEW: user-controlled volume
 
-        # Volume/fade runtime state
+        # Volume/fade runtime state, owned (single writer) by the audio callback
         self._vol: float = 0.0  # current effective volume [0..1]
         self._vol_target: float = 0.0  # target effective volume [0..1]
         self._fade_samples_left: int = 0
         self._fade_step: float = 0.0
+        # Fade requests published by control threads as a single tuple
+        # assignment (target, fade_ms); the callback applies each one once.
+        self._fade_request: Optional[tuple[float, int]] = None
+        self._fade_applied: Optional[tuple[float, int]] = None
+        self._cb_loop: Optional[np.ndarray] = None  # loop seen by the callback
+        # (loop, loop_ext, n) published as one tuple for the callback
+        self._cb_buffers: Optional[tuple[np.ndarray, np.ndarray, int]] = None
+
+        # Preallocated scratch buffers for the fade ramp (no allocation in callback)
+        self._ramp_idx: np.ndarray = np.empty(0, dtype=np.float32)
+        self._ramp_buf: np.ndarray = np.empty(0, dtype=np.float32)
+        self._ensure_ramp_capacity(self.blocksize)
 
         # Control / timers
-        self._resume_timer: Optional[threading.Timer] = None
-        self._resume_deadline: Optional[float] = None
+        self._resume_timer: Optional[Future] = None
+        self._resume_deadline: Optional[float] = None  # time.monotonic() based
 
         # Stream
         self._stream: Optional[sd.OutputStream] = None
@@ -98,8 +128,12 @@ class LoopPlayer:
         Explicitly reload the fixed WAV loop from disk.
         Useful if the file content is replaced while the process is running.
         """
+        # Decode outside _lock so set_enabled/set_volume/status are not stalled
+        # behind disk I/O and resampling; only the buffer swap is locked.
+        with self._decode_lock:
+            ext, n, sr = self._decode_fixed_loop()
         with self._lock:
-            self._load_fixed_loop()
+            self._install_loop(ext, n, sr)
         servo_logger.logger.info("LOOP_AUDIO_RELOADED | file=%s", LOOP_WAV_PATH.name)
 
     def replace_audio(self, *_args, **_kwargs) -> None:
@@ -138,27 +172,22 @@ class LoopPlayer:
 
         def _release() -> None:
             with self._lock:
-                self._resume_timer = None
-                self._resume_deadline = None
-                if self._suppression_count > 0:
-                    self._suppression_count -= 1
+                self._release_one_locked()
 
         with self._lock:
             if self._suppression_count == 0:
                 return
             self._cancel_resume_timer_locked()
             if delay <= 0:
-                _release()
+                self._release_one_locked()
                 servo_logger.logger.debug(
                     "LOOP_SUPPRESSION_RELEASED_IMMEDIATE | count=%s",
                     self._suppression_count,
                 )
                 return
-            self._resume_deadline = time.time() + delay
-            timer = threading.Timer(delay, _release)
-            timer.daemon = True
-            self._resume_timer = timer
-            timer.start()
+            self._resume_deadline = time.monotonic() + delay
+            # Shared asyncio loop thread instead of one Timer thread per call
+            self._resume_timer = call_later(delay, _release)
             servo_logger.logger.debug(
                 "LOOP_SUPPRESSION_TIMER | delay=%.2fs | count=%s",
                 delay,
@@ -180,7 +209,7 @@ class LoopPlayer:
             vol = max(0.0, min(1.0, float(volume)))
             self._user_gain = vol
             # If we are supposed to play now, fade towards user gain, else keep target at 0
-            target = vol if self._should_play_locked() else 0.0
+            target = vol if self._should_play() else 0.0
             self._set_fade(target=target, fade_ms=fade_ms)
         servo_logger.logger.info(
             "LOOP_VOLUME_SET | user_gain=%.3f | fade_ms=%s", self._user_gain, fade_ms
@@ -192,7 +221,7 @@ class LoopPlayer:
             suppressed = self._suppression_count > 0
             resume_in = None
             if suppressed and self._resume_deadline:
-                resume_in = max(0.0, self._resume_deadline - time.time())
+                resume_in = max(0.0, self._resume_deadline - time.monotonic())
             playing = (
                 self._loop is not None
                 and self._user_enabled
@@ -230,6 +259,12 @@ class LoopPlayer:
         servo_logger.logger.info("LOOP_STOPPED")
 
     # ----------------------- Internal helpers -----------------------
+    def _release_one_locked(self) -> None:
+        self._resume_timer = None
+        self._resume_deadline = None
+        if self._suppression_count > 0:
+            self._suppression_count -= 1
+
     def _cancel_resume_timer_locked(self) -> None:
         timer = self._resume_timer
         if timer:
@@ -238,67 +273,182 @@ class LoopPlayer:
         self._resume_deadline = None
 
     def _set_fade(self, target: float, fade_ms: Optional[int]) -> None:
+        # Publish the request; the audio callback picks it up on its next block.
         target = float(np.clip(target, 0.0, 1.0))
         fade_ms = self.fade_ms if fade_ms is None else max(0, int(fade_ms))
-        if self._sr is None or self._sr <= 0:
-            # Not initialized; just set directly
-            self._vol = target
-            self._vol_target = target
-            self._fade_samples_left = 0
-            self._fade_step = 0.0
-            return
-
-        if fade_ms == 0:
-            self._vol = target
-            self._vol_target = target
-            self._fade_samples_left = 0
-            self._fade_step = 0.0
-            return
-
-        self._vol_target = target
+        self._fade_request = (target, fade_ms)
+
+    def _compute_fade(
+        self, vol: float, target: float, fade_ms: int
+    ) -> tuple[float, int, float]:
+        """Return (vol, fade_samples_left, fade_step) for a fade towards target."""
+        if self._sr is None or self._sr <= 0 or fade_ms == 0:
+            return target, 0, 0.0
         samples = int(self._sr * (fade_ms / 1000.0))
         if samples <= 0:
-            self._vol = target
-            self._fade_samples_left = 0
-            self._fade_step = 0.0
-        else:
-            self._fade_samples_left = samples
-            self._fade_step = (self._vol_target - self._vol) / samples
-
-    def _should_play_locked(self) -> bool:
+            return target, 0, 0.0
+        return vol, samples, (target - vol) / samples
+
+    def _ensure_ramp_capacity(self, frames: int) -> None:
+        # Only grows; runs once at startup unless PortAudio hands us a larger block.
+        if frames > self._ramp_buf.shape[0]:
+            self._ramp_idx = np.arange(frames, dtype=np.float32)
+            self._ramp_buf = np.empty(frames, dtype=np.float32)
+
+    def _should_play(self) -> bool:
         return (
             self._loop is not None
             and self._user_enabled
             and self._suppression_count == 0
         )
 
-    def _update_fade_target_if_needed_locked(self) -> None:
-        # If should play, target is user gain; otherwise, target is 0
-        target = self._user_gain if self._should_play_locked() else 0.0
-        if abs(self._vol_target - target) > 1e-6:
-            self._set_fade(target=target, fade_ms=self.fade_ms)
+    def _device_format(self) -> tuple[Optional[int], Optional[int]]:
+        """Return the output device's (default_samplerate, max_output_channels)."""
+        try:
+            info = sd.query_devices(self.device, "output")
+            return int(info["default_samplerate"]), int(info["max_output_channels"])
+        except Exception:
+            servo_logger.logger.warning("LOOP_DEVICE_QUERY_FAILED", exc_info=True)
+            return None, None
+
+    def _wrap_pad(self) -> int:
+        # Frames appended after the loop end; blocksize=0 lets PortAudio pick
+        return self.blocksize if self.blocksize > 0 else 4096
+
+    def _read_loop_pcm(self) -> tuple[np.ndarray, int, int]:
+        """
+        Return (loop_ext, n, sr): a (n + pad, C) float32 C-contiguous array at
+        the target rate whose last pad frames repeat the loop start.
+        Prefers a memory-mapped sidecar; (re)builds it from the WAV when stale.
+        """
+        pad = self._wrap_pad()
+        src_stat = LOOP_WAV_PATH.stat()
+        src_info = sf.info(str(LOOP_WAV_PATH))
+        native_sr = int(src_info.samplerate)
+        device_sr, device_ch = self._device_format()
+        target_sr = device_sr if (device_sr and soxr is not None) else native_sr
+        # Mono file on a stereo device (or the reverse): convert once here
+        # rather than letting PortAudio broadcast/mix every block.
+        target_ch = int(src_info.channels)
+        if device_ch:
+            if target_ch == 1 and device_ch >= 2:
+                target_ch = 2
+            elif target_ch > device_ch:
+                target_ch = device_ch
+
+        pcm_path = LOOP_WAV_PATH.with_name(LOOP_WAV_PATH.name + LOOP_PCM_SUFFIX)
+        header_path = LOOP_WAV_PATH.with_name(
+            LOOP_WAV_PATH.name + LOOP_PCM_HEADER_SUFFIX
+        )
+        try:
+            header = json.loads(header_path.read_text(encoding="utf-8"))
+            if (
+                header.get("source_mtime_ns") == src_stat.st_mtime_ns
+                and header.get("source_size") == src_stat.st_size
+                and header.get("sr") == target_sr
+                and header.get("pad") == pad
+                and header.get("channels") == target_ch
+            ):
+                n = int(header["n"])
+                shape = (n + pad, int(header["channels"]))
+                if pcm_path.stat().st_size != shape[0] * shape[1] * 4:
+                    raise ValueError("PCM sidecar size does not match its header")
+                data = np.memmap(pcm_path, dtype=np.float32, mode="r", shape=shape)
+                servo_logger.logger.info("LOOP_PCM_CACHE_HIT | file=%s", pcm_path.name)
+                return data, n, target_sr
+        except FileNotFoundError:
+            pass
+        except Exception:
+            servo_logger.logger.warning("LOOP_PCM_CACHE_INVALID", exc_info=True)
+
+        # Read as float32, always 2D (shape: (N, C))
+        data, sr = sf.read(LOOP_WAV_PATH, dtype="float32", always_2d=True)
+        # Resample once to the device rate so the host never resamples per block
+        if target_sr != int(sr):
+            data = soxr.resample(data, int(sr), target_sr)
+            servo_logger.logger.info(
+                "LOOP_AUDIO_RESAMPLED | from=%d | to=%d", int(sr), target_sr
+            )
+        if data.shape[1] != target_ch:
+            if data.shape[1] == 1:
+                data = np.repeat(data, target_ch, axis=1)
+            elif target_ch == 1:
+                data = data.mean(axis=1, keepdims=True)
+            else:
+                data = data[:, :target_ch]
+            servo_logger.logger.info(
+                "LOOP_AUDIO_CHANNELS | from=%d | to=%d", src_info.channels, target_ch
+            )
+        # C-contiguous float32 so loop[pos:pos+take] is a contiguous view
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        n = int(data.shape[0])
+        if data.size == 0:
+            return data, 0, target_sr
+        # Append the wrap-around tail (index modulo n also covers short loops)
+        data = np.concatenate([data, data[np.arange(pad) % n]], axis=0)
+
+        tmp_path = pcm_path.with_name(pcm_path.name + ".tmp")
+        try:
+            data.tofile(tmp_path)
+            # Header first: a crash between the two steps must leave no header,
+            # never an old header describing the new PCM (forces a rebuild)
+            header_path.unlink(missing_ok=True)
+            os.replace(tmp_path, pcm_path)
+            header_path.write_text(
+                json.dumps(
+                    {
+                        "sr": target_sr,
+                        "channels": int(data.shape[1]),
+                        "n": n,
+                        "pad": pad,
+                        "source_mtime_ns": src_stat.st_mtime_ns,
+                        "source_size": src_stat.st_size,
+                    }
+                ),
+                encoding="utf-8",
+            )
+            servo_logger.logger.info("LOOP_PCM_CACHE_CREATED | file=%s", pcm_path.name)
+            return (
+                np.memmap(pcm_path, dtype=np.float32, mode="r", shape=data.shape),
+                n,
+                target_sr,
+            )
+        except Exception:
+            servo_logger.logger.warning("LOOP_PCM_CACHE_WRITE_FAILED", exc_info=True)
+            try:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            except Exception:
+                pass
+            return data, n, target_sr
 
     def _load_fixed_loop(self) -> None:
         """Load the fixed WAV loop from LOOP_WAV_PATH. Raises on missing/empty."""
+        ext, n, sr = self._decode_fixed_loop()
+        self._install_loop(ext, n, sr)
+
+    def _decode_fixed_loop(self) -> tuple[np.ndarray, int, int]:
+        """Read the loop PCM without touching player state. Raises on missing/empty."""
         if not LOOP_WAV_PATH.exists():
             raise FileNotFoundError(f"Loop file not found: {LOOP_WAV_PATH}")
 
-        # Read as float32, always 2D (shape: (N, C))
-        data, sr = sf.read(LOOP_WAV_PATH, dtype="float32", always_2d=True)
-        if data.size == 0 or data.shape[0] == 0:
+        ext, n, sr = self._read_loop_pcm()
+        if ext.size == 0 or n == 0:
             raise ValueError("Fichier audio vide: boucle.wav")
+        return ext, n, sr
 
+    def _install_loop(self, ext: np.ndarray, n: int, sr: int) -> None:
+        """Publish decoded PCM to the callback."""
         # Swap atomically
-        self._loop = data  # (N, C), float32
+        loop = ext[:n]
         self._sr = int(sr)
-        self._channels = int(data.shape[1])
-        self._n = int(data.shape[0])
-        self._pos = 0
-        # Reset fades to silent until enabled; keep user gain unchanged
-        self._vol = 0.0
-        self._vol_target = 0.0
-        self._fade_samples_left = 0
-        self._fade_step = 0.0
+        self._channels = int(ext.shape[1])
+        self._n = n
+        self._loop = loop  # (N, C), float32 view
+        self._cb_buffers = (loop, ext, n)
+        # Reset fades to silent until enabled; keep user gain unchanged.
+        # The callback restarts at sample 0 when it sees the new array.
+        self._set_fade(target=0.0, fade_ms=0)
 
         servo_logger.logger.info(
             "LOOP_AUDIO_LOADED | file=%s | sr=%d | ch=%d | samples=%d | duration=%.3fs",
@@ -324,6 +474,8 @@ class LoopPlayer:
             finally:
                 self._stream = None
 
+        self._ensure_ramp_capacity(self.blocksize)
+
         self._stream = sd.OutputStream(
             samplerate=self._sr,
             channels=self._channels,
@@ -343,69 +495,105 @@ class LoopPlayer:
 
     # ----------------------- Audio callback -----------------------
     def _callback(self, outdata: np.ndarray, frames: int, time_info, status) -> None:
-        # Called from PortAudio's realtime thread. Keep this minimal and lock only briefly.
+        # Called from PortAudio's realtime thread. Keep this minimal and never lock.
         if status:
             # You can log XRuns etc. (avoid heavy logging here though)
             pass
 
-        loop = self._loop
-        if loop is None or self._n == 0 or self._channels is None:
+        buffers = self._cb_buffers
+        if buffers is None:
             outdata.fill(0.0)
             return
 
-        with self._lock:
-            # Update fade target based on current state (uses user gain)
-            self._update_fade_target_if_needed_locked()
-
-            n = self._n
-            pos = self._pos  # local copy
-            vol = self._vol
-            vol_target = self._vol_target
-            fade_left = self._fade_samples_left
-            fade_step = self._fade_step
+        # Lock-free: callback-owned state is copied to locals, control state is
+        # read once per block.
+        loop, loop_ext, n = buffers
+        ext_len = loop_ext.shape[0]
+        pos = self._pos
+        if loop is not self._cb_loop:
+            self._cb_loop = loop
+            pos = 0
+        elif pos >= n:
+            pos %= n
+        vol = self._vol
+        vol_target = self._vol_target
+        fade_left = self._fade_samples_left
+        fade_step = self._fade_step
+
+        request = self._fade_request
+        if request is not None and request is not self._fade_applied:
+            self._fade_applied = request
+            vol_target, fade_ms = request
+            vol, fade_left, fade_step = self._compute_fade(vol, vol_target, fade_ms)
+
+        # Update fade target based on current state (uses user gain)
+        target = self._user_gain if self._should_play() else 0.0
+        if abs(vol_target - target) > 1e-6:
+            vol_target = target
+            vol, fade_left, fade_step = self._compute_fade(
+                vol, vol_target, self.fade_ms
+            )
 
         # Prepare output (avoid allocations in hot path: outdata is provided)
+        self._ensure_ramp_capacity(frames)
+        ramp_idx = self._ramp_idx
+        ramp_buf = self._ramp_buf
         frames_remaining = frames
         write_index = 0
 
         while frames_remaining > 0:
-            to_end = n - pos
-            take = to_end if to_end < frames_remaining else frames_remaining
-            seg = loop[pos : pos + take]  # view
+            # loop_ext repeats the loop start past n, so a block up to the pad
+            # size is one contiguous slice; only larger blocks stop at the end.
+            if pos + frames_remaining <= ext_len:
+                take = frames_remaining
+            else:
+                take = n - pos
+            seg = loop_ext[pos : pos + take]  # view
 
             # Apply fade/volume
             if fade_left > 0:
                 steps = take if take < fade_left else fade_left
-                # ramp for 'steps'
-                ramp = vol + fade_step * np.arange(steps, dtype=np.float32)
+                # ramp for 'steps', computed in place in the scratch buffer
+                ramp = ramp_buf[:steps]
+                np.multiply(ramp_idx[:steps], fade_step, out=ramp)
+                ramp += vol
                 np.clip(ramp, 0.0, 1.0, out=ramp)
-                outdata[write_index : write_index + steps, :] = (
-                    seg[:steps] * ramp[:, None]
+                np.multiply(
+                    seg[:steps],
+                    ramp[:, None],
+                    out=outdata[write_index : write_index + steps],
                 )
                 vol = float(ramp[-1])
                 fade_left -= steps
                 if take > steps:
-                    outdata[write_index + steps : write_index + take, :] = (
-                        seg[steps:take] * vol_target
+                    np.multiply(
+                        seg[steps:take],
+                        vol_target,
+                        out=outdata[write_index + steps : write_index + take],
                     )
                     vol = float(vol_target)
                     fade_left = 0
+            elif vol == 1.0:
+                # Unity gain: plain copy, no multiply. Exact compare: fades end
+                # on vol_target itself, and a 0.999 gain must still be applied
+                np.copyto(outdata[write_index : write_index + take], seg)
+            elif vol <= 0.0:
+                outdata[write_index : write_index + take].fill(0.0)
             else:
                 # Constant volume
-                outdata[write_index : write_index + take, :] = seg * vol
+                np.multiply(seg, vol, out=outdata[write_index : write_index + take])
 
             # Advance pointers
             write_index += take
             frames_remaining -= take
             pos = (pos + take) % n
 
-        # Commit updated state back under lock
-        with self._lock:
-            self._pos = pos
-            self._vol = vol
-            self._vol_target = vol_target
-            self._fade_samples_left = fade_left
-            self._fade_step = fade_step
+        # Commit updated state (single writer: this thread)
+        self._pos = pos
+        self._vol = vol
+        self._vol_target = vol_target
+        self._fade_samples_left = fade_left
+        self._fade_step = fade_step
 
     # ----------------------- Dunder -----------------------
     def __del__(self) -> None:
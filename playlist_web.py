@@ -2,20 +2,30 @@
 
 from __future__ import annotations
 
+import hashlib
 import os
-import re
 import threading
 import time
 import uuid
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict
+from typing import Dict, FrozenSet
 
 import requests
+from requests.adapters import HTTPAdapter
 from flask import Flask, jsonify, render_template, request, Response
+from flask.json.provider import DefaultJSONProvider
+
+# orjson (optional) speeds up jsonify and backend payload parsing
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 CLIENT_COOKIE_NAME = "playlist_public_id"
 DEFAULT_COOLDOWN_SECONDS = 180
 MAX_COOKIE_AGE = 60 * 60 * 24 * 30  # 30 days
+MAX_TRACKED_CLIENTS = int(os.environ.get("PLAYLIST_MAX_CLIENTS", "10000"))
 
 LIBRARY_ROOT = (
     Path(os.environ.get("PLAYLIST_LIBRARY_DIR", "data")).expanduser().resolve()
@@ -24,18 +34,24 @@ COOLDOWN_SECONDS = int(os.environ.get("PLAYLIST_COOLDOWN", DEFAULT_COOLDOWN_SECO
 FORWARD_TIMEOUT = float(os.environ.get("PLAYLIST_FORWARD_TIMEOUT", "10"))
 STATUS_TIMEOUT = float(os.environ.get("PLAYLIST_STATUS_TIMEOUT", "6"))
 VOLUME_MAX = int(os.environ.get("PLAYLIST_VOLUME_MAX", "127"))
+STATUS_CACHE_TTL = float(os.environ.get("PLAYLIST_STATUS_CACHE_TTL", "0.4"))
 
 VOLUME_ACTIONS = {"up", "down", "mute", "set"}
 
-HEADER_IMAGE_SRC = "/static/web.png"
-HEADER_IMAGE_CLASS = "fixed-header-image"
-HEADER_IMAGE_STYLE = (
-    "<style>"
-    ".fixed-header-image{position:fixed;top:0;left:50%;transform:translateX(-50%);"
-    "z-index:1000;pointer-events:none;max-width:100%;height:auto;opacity: 0.3;}"
-    "</style>"
-)
-_BODY_TAG_RE = re.compile(r"<body([^>]*)>", re.IGNORECASE)
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _versioned_static(filename: str) -> str:
+    """Static URL carrying a content hash, so it can be cached forever."""
+    try:
+        digest = hashlib.sha1((STATIC_DIR / filename).read_bytes()).hexdigest()[:10]
+    except OSError:
+        return f"/static/{filename}"
+    return f"/static/{filename}?v={digest}"
+
+
+HEADER_IMAGE_SRC = _versioned_static("web.png")
 
 
 def _backend_base_url() -> str:
@@ -49,39 +65,196 @@ def _backend_base_url() -> str:
 app = Flask(__name__, static_folder="static", template_folder="templates")
 
 
+if orjson is not None:
+
+    class _OrJSONProvider(DefaultJSONProvider):
+        """jsonify() through orjson; falls back to Flask's encoder on odd types."""
+
+        def dumps(self, obj, **kwargs) -> str:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+            except TypeError:
+                return super().dumps(obj, **kwargs)
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = _OrJSONProvider(app)
+
+
+def _loads_response(response: requests.Response):
+    """Parse a backend response body; raises ValueError on invalid JSON."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+@app.after_request
+def _cache_versioned_static(resp: Response) -> Response:
+    # Content-hashed URLs never change: let the browser skip revalidation
+    if (
+        resp.status_code == 200
+        and request.path.startswith("/static/")
+        and request.args.get("v")
+    ):
+        resp.cache_control.no_cache = None
+        resp.cache_control.public = True
+        resp.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+        resp.cache_control.immutable = True
+    return resp
+
+
+# Keep-alive connection pool shared by every forward to the backend
+_backend_session = requests.Session()
+_backend_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0)
+_backend_session.mount("http://", _backend_adapter)
+_backend_session.mount("https://", _backend_adapter)
+
+
 class ClientState:
-    __slots__ = ("created_at", "last_submit_at")
+    __slots__ = ("created_at", "last_submit_at", "last_seen_at")
 
     def __init__(self, created_at: float) -> None:
         self.created_at = created_at
         self.last_submit_at = 0.0
+        self.last_seen_at = created_at
 
 
-_clients: Dict[str, ClientState] = {}
+# Known browser ids as an LRU: bounded memory, the oldest ids are evicted first
+_clients: OrderedDict[str, ClientState] = OrderedDict()
 _client_lock = threading.Lock()
+# Idle ids are dropped once they could no longer be in cooldown
+CLIENT_IDLE_TTL = max(COOLDOWN_SECONDS, 60)
 
 
-def _scan_available_sessions() -> list[dict[str, str]]:
-    sessions: list[dict[str, str]] = []
-    base = LIBRARY_ROOT
-    if not base.exists():
-        return sessions
+def _expire_idle_clients_locked(now: float) -> None:
+    # LRU order: stop at the first recently seen id, so this is O(expired)
+    while _clients:
+        oldest_id = next(iter(_clients))
+        if now - _clients[oldest_id].last_seen_at < CLIENT_IDLE_TTL:
+            break
+        _clients.pop(oldest_id, None)
+
+
+def _touch_client(client_id: str) -> tuple[ClientState, bool]:
+    # Every reorder happens under the lock: _expire_idle_clients_locked iterates
+    # the OrderedDict, and a concurrent move_to_end() would break that iteration.
+    now = time.time()
+    with _client_lock:
+        state = _clients.get(client_id)
+        if state is not None:
+            state.last_seen_at = now
+            _clients.move_to_end(client_id)
+            return state, False
+        _expire_idle_clients_locked(now)
+        state = ClientState(created_at=now)
+        _clients[client_id] = state
+        while len(_clients) > MAX_TRACKED_CLIENTS:
+            _clients.popitem(last=False)
+        return state, True
+
+
+# Client ids with a /play forward in flight (O(1) duplicate-submit check)
+_pending_submits: set[str] = set()
+_pending_submits_lock = threading.Lock()
+
+
+# Directory listing cached per LIBRARY_ROOT mtime: a request only pays one stat()
+_sessions_cache_lock = threading.Lock()
+_sessions_cache_mtime: int = -1
+_sessions_cache: list[dict[str, str]] = []
+_sessions_cache_names: FrozenSet[str] = frozenset()
+
+
+def _refresh_sessions_cache() -> None:
+    global _sessions_cache_mtime, _sessions_cache, _sessions_cache_names
     try:
-        for entry in sorted(base.iterdir(), key=lambda p: p.name.lower()):
-            if entry.is_dir():
-                sessions.append({"name": entry.name, "display": entry.name})
-    except Exception:
-        pass
-    return sessions
+        mtime = LIBRARY_ROOT.stat().st_mtime_ns
+    except OSError:
+        mtime = -1
+    with _sessions_cache_lock:
+        if mtime != -1 and mtime == _sessions_cache_mtime:
+            return
+        sessions: list[dict[str, str]] = []
+        if mtime != -1:
+            try:
+                with os.scandir(LIBRARY_ROOT) as it:
+                    # DirEntry.is_dir() uses d_type; only symlinks need a stat()
+                    names = [entry.name for entry in it if entry.is_dir()]
+                for name in sorted(names, key=str.lower):
+                    sessions.append({"name": name, "display": name})
+            except Exception:
+                pass
+        _sessions_cache = sessions
+        _sessions_cache_names = frozenset(item["name"] for item in sessions)
+        _sessions_cache_mtime = mtime
 
 
-def _fetch_playlist_state() -> dict:
+def _scan_available_sessions() -> list[dict[str, str]]:
+    _refresh_sessions_cache()
+    return _sessions_cache
+
+
+def _available_session_names() -> FrozenSet[str]:
+    _refresh_sessions_cache()
+    return _sessions_cache_names
+
+
+# Playlist state shared by concurrent callers: short TTL cache + single flight
+_status_lock = threading.Lock()
+_status_cache: Dict[str, tuple[float, dict]] = {}
+_status_inflight: Dict[str, threading.Event] = {}
+
+
+def _fetch_playlist_state(force: bool = False) -> dict:
+    """
+    Return the backend playlist state. Callers within STATUS_CACHE_TTL share
+    one upstream GET; force=True bypasses the cache (e.g. right after enqueue).
+    """
+    base = _backend_base_url()
+    leader = force
+    event = None
+    with _status_lock:
+        cached = _status_cache.get(base)
+        if (
+            not force
+            and cached is not None
+            and time.monotonic() - cached[0] < STATUS_CACHE_TTL
+        ):
+            return cached[1]
+        if not force:
+            event = _status_inflight.get(base)
+            if event is None:
+                event = threading.Event()
+                _status_inflight[base] = event
+                leader = True
+
+    if not leader:
+        event.wait(STATUS_TIMEOUT)
+        with _status_lock:
+            cached = _status_cache.get(base)
+        if cached is not None:
+            return cached[1]
+        return _request_playlist_state(base)
+
+    payload: dict = {}
     try:
-        response = requests.get(
-            f"{_backend_base_url()}/playlist", timeout=STATUS_TIMEOUT
-        )
+        payload = _request_playlist_state(base)
+    finally:
+        with _status_lock:
+            _status_cache[base] = (time.monotonic(), payload)
+            if event is not None:
+                _status_inflight.pop(base, None)
+        if event is not None:
+            event.set()
+    return payload
+
+
+def _request_playlist_state(base: str) -> dict:
+    try:
+        response = _backend_session.get(f"{base}/playlist", timeout=STATUS_TIMEOUT)
         if response.ok:
-            payload = response.json()
+            payload = _loads_response(response)
             if isinstance(payload, dict):
                 return payload
             return {"data": payload}
@@ -93,27 +266,29 @@ def _fetch_playlist_state() -> dict:
 def _resolve_client() -> tuple[str, bool]:
     raw_id = request.cookies.get(CLIENT_COOKIE_NAME)
     created = False
-    if raw_id:
+    # Ids are uuid4().hex: a length check plus bytes.fromhex is enough and much
+    # cheaper than building a uuid.UUID on every request.
+    client_id = None
+    if raw_id and len(raw_id) == 32:
         try:
-            uuid.UUID(raw_id)
+            bytes.fromhex(raw_id)
             client_id = raw_id
-        except Exception:
-            client_id = uuid.uuid4().hex
-            created = True
-    else:
+        except ValueError:
+            pass
+    if client_id is None:
         client_id = uuid.uuid4().hex
         created = True
 
-    with _client_lock:
-        if client_id not in _clients:
-            _clients[client_id] = ClientState(created_at=time.time())
-            created = True
-    return client_id, created
+    _, inserted = _touch_client(client_id)
+    return client_id, created or inserted
 
 
 def _client_state(client_id: str) -> ClientState:
-    with _client_lock:
-        return _clients.setdefault(client_id, ClientState(created_at=time.time()))
+    # Lock-free fast path: _resolve_client has already inserted or touched the entry
+    state = _clients.get(client_id)
+    if state is not None:
+        return state
+    return _touch_client(client_id)[0]
 
 
 def _cooldown_remaining(state: ClientState) -> float:
@@ -141,24 +316,6 @@ def _json(
     return resp
 
 
-def _inject_header_image(html: str) -> str:
-    if HEADER_IMAGE_CLASS in html:
-        return html
-    updated = html
-    if "</head>" in updated:
-        updated = updated.replace("</head>", HEADER_IMAGE_STYLE + "</head>", 1)
-    match = _BODY_TAG_RE.search(updated)
-    if match:
-        start, end = match.span()
-        body_tag = match.group(0)
-        injection = (
-            f'{body_tag}<img src="{HEADER_IMAGE_SRC}" alt="Page overlay" '
-            f'class="{HEADER_IMAGE_CLASS}">'
-        )
-        updated = updated[:start] + injection + updated[end:]
-    return updated
-
-
 @app.route("/favicon.ico")
 def favicon() -> Response:
     return app.send_static_file("SkullPlayer.png")
@@ -175,8 +332,8 @@ def index() -> Response:
         cooldown_remaining=cooldown,
         available_sessions=_scan_available_sessions(),
         playlist_state=_fetch_playlist_state(),
+        header_image_src=HEADER_IMAGE_SRC,
     )
-    html = _inject_header_image(html)
     resp = app.make_response(html)
     if created:
         resp.set_cookie(
@@ -222,7 +379,7 @@ def api_volume() -> Response:
         payload["value"] = value
 
     try:
-        upstream = requests.post(
+        upstream = _backend_session.post(
             f"{_backend_base_url()}/volume",
             json=payload,
             timeout=FORWARD_TIMEOUT,
@@ -234,7 +391,7 @@ def api_volume() -> Response:
         )
 
     try:
-        payload = upstream.json()
+        payload = _loads_response(upstream)
     except ValueError:
         payload = {"status": upstream.text.strip()}
 
@@ -258,15 +415,7 @@ def api_enqueue() -> Response:
 
     remaining = _cooldown_remaining(state)
     if remaining > 0:
-        return _json(
-            {
-                "error": "Cooldown actif",
-                "cooldown_remaining": int(remaining),
-            },
-            status=429,
-            client_id=client_id,
-            set_cookie=created,
-        )
+        return _cooldown_response(remaining, client_id, created)
 
     data = request.get_json(silent=True) or {}
     session = (data.get("session") or "").strip()
@@ -278,8 +427,7 @@ def api_enqueue() -> Response:
             set_cookie=created,
         )
 
-    available = {entry["name"] for entry in _scan_available_sessions()}
-    if session not in available:
+    if session not in _available_session_names():
         return _json(
             {"error": "Session inconnue"},
             status=404,
@@ -287,8 +435,47 @@ def api_enqueue() -> Response:
             set_cookie=created,
         )
 
+    # One forward per client at a time: a double click would otherwise pass the
+    # cooldown check twice before last_submit_at is written. The cooldown is
+    # checked again with the claim: last_submit_at is set before the previous
+    # holder releases its slot, so a request that passed the early check while
+    # that forward was in flight is refused here.
+    with _pending_submits_lock:
+        if client_id in _pending_submits:
+            return _json(
+                {"error": "Demande deja en cours"},
+                status=409,
+                client_id=client_id,
+                set_cookie=created,
+            )
+        remaining = _cooldown_remaining(state)
+        if remaining > 0:
+            return _cooldown_response(remaining, client_id, created)
+        _pending_submits.add(client_id)
     try:
-        upstream = requests.post(
+        return _forward_enqueue(session, state, client_id, created)
+    finally:
+        with _pending_submits_lock:
+            _pending_submits.discard(client_id)
+
+
+def _cooldown_response(remaining: float, client_id: str, created: bool) -> Response:
+    return _json(
+        {
+            "error": "Cooldown actif",
+            "cooldown_remaining": int(remaining),
+        },
+        status=429,
+        client_id=client_id,
+        set_cookie=created,
+    )
+
+
+def _forward_enqueue(
+    session: str, state: ClientState, client_id: str, created: bool
+) -> Response:
+    try:
+        upstream = _backend_session.post(
             f"{_backend_base_url()}/play",
             json={"session": session},
             timeout=FORWARD_TIMEOUT,
@@ -302,7 +489,7 @@ def api_enqueue() -> Response:
         )
 
     try:
-        upstream_payload = upstream.json()
+        upstream_payload = _loads_response(upstream)
     except ValueError:
         upstream_payload = {"status": upstream.text.strip()}
 
@@ -324,7 +511,7 @@ def api_enqueue() -> Response:
         "status": upstream_payload.get("status", "queued"),
         "server": upstream_payload,
         "cooldown_remaining": COOLDOWN_SECONDS,
-        "playlist": _fetch_playlist_state(),
+        "playlist": _fetch_playlist_state(force=True),
     }
     return _json(
         payload, status=upstream.status_code, client_id=client_id, set_cookie=created
@@ -332,4 +519,18 @@ def api_enqueue() -> Response:
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5050, debug=True)
+    try:
+        from waitress import serve
+    except ImportError:  # pragma: no cover - development fallback
+        serve = None
+    if serve is not None:
+        # Bounded worker pool: a slow backend forward only parks its own thread
+        serve(
+            app,
+            host="0.0.0.0",
+            port=5050,
+            threads=int(os.environ.get("PLAYLIST_WEB_THREADS", "16")),
+            connection_limit=500,
+        )
+    else:
+        app.run(host="0.0.0.0", port=5050, debug=True, threaded=True)
@@ -15,8 +15,12 @@ MODIFIED: Intégré avec système de logging pour traçage des commandes servo.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict
+import math
+import struct
+import threading
+from array import array
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, Mapping
 
 # Hard dependency: raise at import time if missing (no simulation).
 try:
@@ -34,7 +38,7 @@ from logger import servo_logger
 
 
 # ----------------------------- Servo model ---------------------------------
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ServoSpec:
     channel: int
     min_us: int = 500  # microseconds @ 0°
@@ -52,24 +56,139 @@ class ServoSpec:
         return self.min_us + (d / 180.0) * span
 
 
+# PCA9685 registers
+_MODE1 = 0x00
+_MODE1_AI = 0x20  # register auto-increment (SLEEP and RESTART cleared)
+_MODE2_OUTDRV = 0x04  # totem-pole outputs (power-on default)
+_LED0_ON_L = 0x06  # LEDn_ON_L = 0x06 + 4*n, auto-incremented through OFF_H
+_PWM_REGS = struct.Struct("<HH")  # ON, OFF (little-endian 16-bit pairs)
+# LED0..LED15 en "full off" (OFF_H bit 4), une seule écriture auto-incrémentée
+_ALL_CHANNELS_OFF = bytes((_LED0_ON_L,)) + _PWM_REGS.pack(0, 0x1000) * 16
+
+
+def _pwm_regs(duty: int) -> tuple[int, int]:
+    """(ON, OFF) register values for a 16-bit duty, as the Adafruit driver does."""
+    if duty == 0xFFFF:
+        return 0x1000, 0  # full on
+    if duty < 0x0010:
+        return 0, 0x1000  # full off
+    return 0, duty >> 4
+
+
 class PCA9685Controller:
     """Thin wrapper around Adafruit PCA9685 to drive pulses in microseconds."""
 
-    def __init__(self, address: int = 0x40, frequency: int = 50):
-        self.i2c = busio.I2C(board.SCL, board.SDA)
+    __slots__ = (
+        "i2c",
+        "pca",
+        "_period_us",
+        "_period_us_int",
+        "_us_to_duty_q16",
+        "_dev",
+        "_tx",
+        "_last_duty",
+    )
+
+    def __init__(
+        self, address: int = 0x40, frequency: int = 50, i2c_hz: int = 400_000
+    ):
+        # On Linux the bus speed is set by the kernel (dtparam=i2c_arm_baudrate,
+        # see install_skull.sh); i2c_hz is honoured by backends that support it.
+        self.i2c = busio.I2C(board.SCL, board.SDA, frequency=i2c_hz)
         self.pca = PCA9685(self.i2c, address=address)
         self.pca.frequency = frequency
         self._period_us = 1_000_000.0 / frequency
-
-    def set_pulse_us(self, channel: int, pulse_us: float) -> None:
+        # µs -> duty 16 bits en virgule fixe Q16 : une multiplication + un décalage
+        self._period_us_int = int(self._period_us)
+        # (arrondi supérieur pour que la période complète donne bien 0xFFFF)
+        self._us_to_duty_q16 = math.ceil((0xFFFF << 16) / self._period_us)
+        # Écriture directe des registres : un tampon de 5 octets par canal
+        # (adresse LEDn_ON_L + ON/OFF), réutilisé à chaque commande
+        self._dev = self.pca.i2c_device
+        # Ce wrapper possède MODE1/MODE2 : configurés une fois ici (AI actif,
+        # déjà mis par le setter frequency), ensuite uniquement des écritures
+        # aveugles des registres LEDn, jamais de relecture de MODE1.
+        with self._dev as i2c:
+            i2c.write(bytes((_MODE1, _MODE1_AI, _MODE2_OUTDRV)))
+        self._tx = [bytearray((_LED0_ON_L + 4 * ch, 0, 0, 0, 0)) for ch in range(16)]
+        # Dernier duty écrit par canal (-1 = inconnu) : évite de renvoyer un état identique
+        self._last_duty = [-1] * 16
+
+    def us_to_duty(self, pulse_us: float) -> int:
         # Convert desired microseconds to 16-bit duty cycle for PCA9685
-        pulse_us = max(0.0, min(self._period_us, float(pulse_us)))
-        duty = int((pulse_us / self._period_us) * 0xFFFF)
-        self.pca.channels[channel].duty_cycle = duty
+        # (whole microseconds: the 12-bit output step is ~4.9 µs at 50 Hz)
+        period = self._period_us_int
+        if pulse_us < 0:
+            pulse = 0
+        elif pulse_us > period:
+            pulse = period
+        else:
+            pulse = int(pulse_us)
+        return (pulse * self._us_to_duty_q16) >> 16
+
+    def set_pulse_us(self, channel: int, pulse_us: float, force: bool = False) -> None:
+        self.set_duty(channel, self.us_to_duty(pulse_us), force=force)
+
+    # Les paramètres _xxx=... lient globales et builtins à la définition
+    # (LOAD_FAST au lieu de LOAD_GLOBAL) ; ne pas les passer à l'appel.
+    def set_duty(
+        self,
+        channel: int,
+        duty: int,
+        force: bool = False,
+        _regs=_pwm_regs,
+        _pack=_PWM_REGS.pack_into,
+    ) -> None:
+        # Skip the transaction when the channel already holds this duty
+        if duty == self._last_duty[channel] and not force:
+            return
+        self._last_duty[channel] = duty
+        # Bypasses PWMChannel/StructArray: one pack_into + one I2C write
+        buf = self._tx[channel]
+        on, off = _regs(duty)
+        _pack(buf, 1, on, off)
+        with self._dev as i2c:
+            i2c.write(buf)
+
+    def set_duties(
+        self,
+        start_channel: int,
+        duties: Iterable[int],
+        force: bool = False,
+        _regs=_pwm_regs,
+        _pack=_PWM_REGS.pack_into,
+        _list=list,
+        _len=len,
+        _enumerate=enumerate,
+    ) -> None:
+        """
+        Write consecutive channels from start_channel in one I2C transaction,
+        relying on MODE1 auto-increment (set in __init__).
+        Skipped entirely when every channel already holds its duty.
+        """
+        duties = _list(duties)
+        end_channel = start_channel + _len(duties)
+        if not force and self._last_duty[start_channel:end_channel] == duties:
+            return
+        self._last_duty[start_channel:end_channel] = duties
+        buf = bytearray(1 + 4 * _len(duties))
+        buf[0] = self._tx[start_channel][0]  # adresse LEDn_ON_L précalculée
+        for i, duty in _enumerate(duties):
+            on, off = _regs(duty)
+            _pack(buf, 1 + 4 * i, on, off)
+        with self._dev as i2c:
+            i2c.write(buf)
+
+    def forget_duties(self) -> None:
+        """Drop the duty cache: the next write of every channel reaches the bus."""
+        self._last_duty = [-1] * 16
 
     def off(self) -> None:
-        for ch in range(16):
-            self.pca.channels[ch].duty_cycle = 0
+        # Same registers as duty_cycle = 0 on every channel, in one transaction.
+        # The cache is dropped first so a failed write cannot leave it stale.
+        self.forget_duties()
+        with self._dev as i2c:
+            i2c.write(_ALL_CHANNELS_OFF)
 
     def deinit(self) -> None:
         try:
@@ -95,8 +214,124 @@ class Hardware:
         "neck_pan": ServoSpec(channel=3, min_deg=0, max_deg=180, pitch_offset=0.0),
     }
 
-    def __init__(self, address: int = 0x40, frequency: int = 50):
-        self.ctrl = PCA9685Controller(address=address, frequency=frequency)
+    # Résolution de la table angle -> duty (0.1°, sous la résolution 12 bits du PCA9685)
+    LUT_STEPS_PER_DEG = 10
+
+    def __init__(
+        self, address: int = 0x40, frequency: int = 50, i2c_hz: int = 400_000
+    ):
+        self.ctrl = PCA9685Controller(
+            address=address, frequency=frequency, i2c_hz=i2c_hz
+        )
+        self._duty_lut: Dict[str, array] = {
+            name: self._build_duty_lut(spec) for name, spec in self.SPECS.items()
+        }
+        # Méthodes de log liées une fois pour toutes (chemin chaud)
+        self._log_servo = servo_logger.log_servo_command
+        self._log_warning = servo_logger.logger.warning
+
+        # Thread d'écriture I2C : les appelants déposent le duty voulu par canal
+        # (le dernier gagne) et ne bloquent plus sur la transaction bus
+        self._pending = [-1] * 16
+        self._pending_lock = threading.Lock()
+        self._bus_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        # Erreurs bus vues par le thread d'écriture (les appelants ne les voient pas)
+        self.i2c_errors = 0
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="pca9685-writer", daemon=True
+        )
+        self._writer.start()
+
+        # Une commande spécialisée par servo (reconstruite si sa table change)
+        self._fast: Dict[str, Callable[..., None]] = {
+            name: self._make_fast(name) for name in self.SPECS
+        }
+
+    def _post_duty(self, channel: int, duty: int) -> None:
+        with self._pending_lock:
+            self._pending[channel] = duty
+        self._wake.set()
+
+    def _writer_loop(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self._flush_pending()
+            except Exception as e:  # garder le thread vivant sur erreur bus
+                self.i2c_errors += 1
+                # état réel des registres inconnu : la prochaine commande réécrit
+                self.ctrl.forget_duties()
+                servo_logger.logger.error(
+                    f"I2C_WRITE_ERROR | count={self.i2c_errors} | {e}"
+                )
+            if self._stopping:
+                return
+
+    def _flush_pending(self) -> None:
+        """Écrit les canaux en attente, une écriture bloc par plage contiguë."""
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = [-1] * 16
+        with self._bus_lock:
+            self._write_runs(pending)
+
+    def _write_runs(self, slots: list, force: bool = False) -> None:
+        """Une écriture bloc par plage contiguë de slots >= 0 (bus verrouillé)."""
+        run_start = -1
+        for ch in range(17):
+            if ch < 16 and slots[ch] >= 0:
+                if run_start < 0:
+                    run_start = ch
+            elif run_start >= 0:
+                self.ctrl.set_duties(run_start, slots[run_start:ch], force=force)
+                run_start = -1
+
+    def _drop_pending(self) -> None:
+        with self._pending_lock:
+            self._pending = [-1] * 16
+
+    def off(self) -> None:
+        """Coupe toutes les sorties ; les commandes en attente sont abandonnées."""
+        with self._bus_lock:
+            self._drop_pending()
+            self.ctrl.off()
+
+    def _write_now(self, slots: list) -> None:
+        """
+        Écriture synchrone forcée des slots >= 0 (indexés par canal) ; annule
+        les commandes en attente sur ces canaux.
+        """
+        with self._bus_lock:
+            with self._pending_lock:
+                for ch, duty in enumerate(slots):
+                    if duty >= 0:
+                        self._pending[ch] = -1
+            self._write_runs(slots, force=True)
+
+    def _build_duty_lut(self, spec: ServoSpec) -> array:
+        """Duty 16 bits pour chaque pas de 0.1° de la plage clampée (offset inclus)."""
+        steps = int(round((spec.max_deg - spec.min_deg) * self.LUT_STEPS_PER_DEG))
+        return array(
+            "H",
+            (
+                self.ctrl.us_to_duty(
+                    spec.angle_to_us(spec.min_deg + i / self.LUT_STEPS_PER_DEG)
+                )
+                for i in range(steps + 1)
+            ),
+        )
+
+    def _clamp_and_duty(self, name: str, deg: float) -> tuple[ServoSpec, float, int]:
+        """Clamp mécanique + lecture de la table en une passe (NaN -> max_deg)."""
+        spec = self.SPECS[name]
+        lo = spec.min_deg
+        hi = spec.max_deg
+        clamped_deg = deg if lo <= deg <= hi else (lo if deg < lo else hi)
+        idx = int((clamped_deg - lo) * self.LUT_STEPS_PER_DEG + 0.5)
+        return spec, clamped_deg, self._duty_lut[name][idx]
 
     def set_named_angle(self, name: str, deg: float, log_enabled: bool = True) -> None:
         """
@@ -107,38 +342,119 @@ class Hardware:
             deg: angle en degrés
             log_enabled: indique si le servo est activé (pour logging)
         """
-        spec = self.SPECS[name]
-        clamped_deg = spec.clamp(deg)
-        us = spec.angle_to_us(clamped_deg)
-
-        # Envoyer la commande au matériel
-        self.ctrl.set_pulse_us(spec.channel, us)
+        self._fast[name](deg, log_enabled)
 
+    def _make_fast(self, name: str) -> Callable[..., None]:
+        """
+        Closure de set_named_angle pour un servo : bornes, table de duty, canal
+        et fonctions de log figés en variables de cellule (aucune recherche
+        d'attribut ou de dict par commande).
+        """
+        spec = self.SPECS[name]
+        lo = spec.min_deg
+        hi = spec.max_deg
+        channel = spec.channel
+        lut = self._duty_lut[name]
+        steps = self.LUT_STEPS_PER_DEG
+        post = self._post_duty
+        log = self._log_servo
+        warn = self._warn_clamp
+
+        def set_angle(
+            deg: float, log_enabled: bool = True, _int=int, _abs=abs
+        ) -> None:
+            # Clamp + duty fusionnés (même logique que _clamp_and_duty)
+            if lo <= deg <= hi:
+                clamped_deg = deg
+                clipped = False
+            else:
+                clamped_deg = lo if deg < lo else hi
+                clipped = True
+
+            # Déposer la commande pour le thread d'écriture (duty précalculé)
+            post(channel, lut[_int((clamped_deg - lo) * steps + 0.5)])
+
+            # Logger la commande (avec l'angle clampé effectif)
+            log(name, clamped_deg, log_enabled)
+
+            # Chemin froid : warning seulement si le clamp a réellement coupé
+            if clipped and _abs(clamped_deg - deg) > 0.1:
+                warn(name, deg, clamped_deg)
+
+        return set_angle
+
+    def set_many(self, angles: Mapping[str, float], log_enabled: bool = True) -> None:
+        """
+        Positionne plusieurs servos ; le thread d'écriture regroupe les canaux
+        consécutifs en une seule écriture I2C (auto-incrément PCA9685).
+        """
+        resolved = [
+            (name, deg) + self._clamp_and_duty(name, deg)
+            for name, deg in angles.items()
+        ]
+        with self._pending_lock:
+            for _, _, spec, _, duty in resolved:
+                self._pending[spec.channel] = duty
+        self._wake.set()
+
+        for name, deg, _, clamped_deg, _ in resolved:
+            self._log_command(name, deg, clamped_deg, log_enabled)
+
+    def _log_command(
+        self, name: str, deg: float, clamped_deg: float, log_enabled: bool
+    ) -> None:
         # Logger la commande (avec l'angle clampé effectif)
-        servo_logger.log_servo_command(name, clamped_deg, log_enabled)
+        self._log_servo(name, clamped_deg, log_enabled)
 
         # Warning si l'angle a été clampé
         if abs(clamped_deg - deg) > 0.1:
-            servo_logger.logger.warning(
-                f"CLAMP | {name} | Requested: {deg:.1f}° → Clamped: {clamped_deg:.1f}°"
-            )
+            self._warn_clamp(name, deg, clamped_deg)
+
+    def _warn_clamp(self, name: str, deg: float, clamped_deg: float) -> None:
+        self._log_warning(
+            f"CLAMP | {name} | Requested: {deg:.1f}° → Clamped: {clamped_deg:.1f}°"
+        )
+
+    # Positions neutres, dans l'ordre des canaux 0..3
+    NEUTRAL_ANGLES: Dict[str, float] = {
+        "jaw": 180,  # slightly closed
+        "eye_left": 90,
+        "eye_right": 90,
+        "neck_pan": 90,
+    }
 
     def neutral(self) -> None:
-        """Move to safe neutral positions"""
-        servo_logger.logger.info("NEUTRAL_POSITION")
-        self.set_named_angle("jaw", 180, log_enabled=True)  # slightly closed
-        self.set_named_angle("eye_left", 90, log_enabled=True)
-        self.set_named_angle("eye_right", 90, log_enabled=True)
-        self.set_named_angle("neck_pan", 90, log_enabled=True)
+        """Move to safe neutral positions (one I2C block write per contiguous channel run, one log line)"""
+        slots = [-1] * 16
+        parts = []
+        for name, deg in self.NEUTRAL_ANGLES.items():
+            spec, clamped_deg, duty = self._clamp_and_duty(name, deg)
+            # placé par canal : un bloc par plage contiguë, quel que soit le câblage
+            slots[spec.channel] = duty
+            parts.append(f"{name}={clamped_deg:.1f}°")
+        # Position de repli : toujours réémise, même si le cache la croit en place
+        self._write_now(slots)
+        servo_logger.logger.info("NEUTRAL_POSITION | " + " ".join(parts))
 
     def cleanup(self) -> None:
         servo_logger.logger.info("HARDWARE_CLEANUP")
-        self.ctrl.deinit()
+        # Vider les commandes en attente puis arrêter le thread d'écriture
+        self._stopping = True
+        self._wake.set()
+        self._writer.join(timeout=1.0)
+        with self._bus_lock:
+            # si le thread n'a pas fini à temps, rien ne doit suivre l'arrêt
+            self._drop_pending()
+            self.ctrl.deinit()
 
     def set_pitch_offset(self, servo_name: str, offset: float) -> None:
         """Définit l'offset de pitch pour un servo"""
         if servo_name in self.SPECS:
-            self.SPECS[servo_name].pitch_offset = offset
+            # ServoSpec est figé : on remplace l'entrée au lieu de la muter
+            spec = replace(self.SPECS[servo_name], pitch_offset=offset)
+            self.SPECS[servo_name] = spec
+            self._duty_lut[servo_name] = self._build_duty_lut(spec)
+            self._fast[servo_name] = self._make_fast(servo_name)
             servo_logger.logger.info(
                 f"PITCH_OFFSET | {servo_name} | Offset: {offset:.1f}°"
             )
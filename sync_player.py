@@ -18,11 +18,15 @@ Behaviour:
 
 from __future__ import annotations
 
+import bisect
+import logging
+import os
 import threading
 import time
 from pathlib import Path
-from typing import Optional, Dict, Callable
+from typing import Optional, Dict, Callable, List, Tuple
 
+import numpy as np
 from pydub import AudioSegment
 import simpleaudio as sa
 
@@ -33,32 +37,84 @@ from logger import servo_logger
 # nouveau : import du récepteur gaze
 from gaze_receiver import GazeReceiver
 
+# Default window for high_precision_timing: sleep until this close to the
+# deadline, then poll the clock
+SPIN_WINDOW_NS = 1_500_000
+
+
+def _env_high_precision_timing() -> bool:
+    """SKULL_HIGH_PRECISION_TIMING=1 opts into the sleep-then-spin frame wait."""
+    value = os.environ.get("SKULL_HIGH_PRECISION_TIMING", "")
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# gaze command key -> tag used in GAZE_OVERRIDE_*_ERROR warnings
+_GAZE_AXES = (("neck", "NECK"), ("eyeL", "EYEL"), ("eyeR", "EYER"))
+_NO_GAZE = (None, None, None)
+
+
+def _parse_gaze_axes(cmd: dict) -> Optional[tuple]:
+    """
+    Yaw overrides (neck, eyeL, eyeR) of a gaze command, parsed once per packet.
+    None when the command is not tracking; an unreadable axis is None (the
+    timeline keeps that servo) and is logged once.
+    """
+    if cmd.get("mode") != "track":
+        return None
+    axes = []
+    for key, tag in _GAZE_AXES:
+        try:
+            axes.append(float(cmd[key]["yaw_deg"]))
+        except Exception as e:
+            servo_logger.logger.warning(f"GAZE_OVERRIDE_{tag}_ERROR | {e}")
+            axes.append(None)
+    return tuple(axes)
+
 
 class SyncPlayer:
-    def __init__(self):
+    def __init__(
+        self,
+        high_precision_timing: Optional[bool] = None,
+        spin_window_ns: int = SPIN_WINDOW_NS,
+    ):
         self.hw = Hardware()
         self.timeline: Optional[Timeline] = None
+        # timeline pre-parsed once in load(): timestamps (ns) for scheduling and
+        # bisect, and one (jaw, neck, eye_left, eye_right) float tuple per frame
+        self._ts_ns: List[int] = []
+        self._angles: List[Tuple[float, float, float, float]] = []
         self.audio: Optional[AudioSegment] = None
+        self._audio_pcm = memoryview(b"")  # view on self.audio.raw_data
         self._play_obj: Optional[sa.PlayObject] = None
         self._thread: Optional[threading.Thread] = None
 
         self._running = threading.Event()
         self._paused = threading.Event()
+        # cleared while paused: the runner blocks on it instead of polling
+        self._resume_evt = threading.Event()
+        self._resume_evt.set()
         self._lock = threading.Lock()
 
         self.session_dir: Optional[Path] = None
 
         # timing
-        self._start_time: float = 0.0  # reference start (shifted during pause)
+        # reference start, time.monotonic_ns() (immune to NTP/wall-clock steps)
+        self._start_ns: int = 0
+        # opt-in sub-ms frame alignment (sleep + short spin, see
+        # _sleep_until_ns); the default plain sleep leaves the CPU and GIL free.
+        # None = SKULL_HIGH_PRECISION_TIMING from the environment.
+        if high_precision_timing is None:
+            high_precision_timing = _env_high_precision_timing()
+        self.high_precision_timing = high_precision_timing
+        self.spin_window_ns = spin_window_ns
         self._pause_pos_ms: int = 0  # audio position at pause
 
         # channels (default: all enabled) - can be updated by web_app via set_channels()
-        self.channels: Dict[str, bool] = {
-            "eye_left": True,
-            "eye_right": True,
-            "neck": True,
-            "jaw": True,
-        }
+        # Plain bools read lock-free by the loops (single attribute stores are
+        # atomic under the GIL); the dict view is only built for status().
+        self._ch_eye_left = True
+        self._ch_eye_right = True
+        self._ch_neck = True
+        self._ch_jaw = True
 
         # last targets (for frozen channels we keep last position)
         self._last_target = {
@@ -124,6 +180,7 @@ class SyncPlayer:
         # Charger les fichiers
         try:
             self.timeline = Timeline.from_json(json_file)
+            self._parse_frames()
 
             used_cache = False
             if cache_exists:
@@ -169,6 +226,8 @@ class SyncPlayer:
             servo_logger.logger.error(f"LOADING_ERROR | {e}")
             raise
 
+        self._audio_pcm = memoryview(self.audio.raw_data)
+
         # Initialiser la session de logging
         session_name = f"{d.name}_{json_file.stem}"
         audio_duration = len(self.audio) / 1000.0  # durée en secondes
@@ -178,18 +237,102 @@ class SyncPlayer:
             f"SESSION_LOADED | Duration: {audio_duration:.3f}s | Frames: {len(self.timeline.frames)}"
         )
 
+    def _parse_frames(self) -> None:
+        """
+        Pre-parse the timeline frames once (vectorized ms -> ns and float
+        coercion), so the runner does no dict lookup or float() per frame.
+        Frames are ordered by timestamp (stable, so equal timestamps keep
+        their file order): the resync bisect needs a sorted timeline.
+        """
+        frames = self.timeline.frames
+        ts_ms = np.array([f["timestamp_ms"] for f in frames], dtype=np.int64)
+        order = np.argsort(ts_ms, kind="stable")
+        if len(order) and (order != np.arange(len(order))).any():
+            servo_logger.logger.warning("TIMELINE_UNSORTED | frames sorted by timestamp_ms")
+            frames = [frames[i] for i in order.tolist()]
+            ts_ms = ts_ms[order]
+        self._ts_ns = (ts_ms * 1_000_000).tolist()
+        angles = np.array(
+            [
+                (f["jaw_deg"], f["neck_pan_deg"], f["eye_left_deg"], f["eye_right_deg"])
+                for f in frames
+            ],
+            dtype=np.float64,
+        )
+        self._angles = list(map(tuple, angles.tolist()))
+
+    def _resync_index(self, frame_idx: int, current_ns: int) -> int:
+        """
+        Index of the last frame already due at current_ns (playback-relative),
+        never behind frame_idx. Relies on _ts_ns being sorted (_parse_frames).
+        """
+        return max(frame_idx, bisect.bisect_right(self._ts_ns, current_ns) - 1)
+
+    def _sleep_until_ns(self, target_ns: int, delay_ns: int) -> None:
+        """
+        Wait for a monotonic deadline. time.sleep alone may overshoot by up
+        to the OS timer slack; in high precision mode the last spin_window_ns
+        are polled instead.
+        """
+        if not self.high_precision_timing:
+            time.sleep(delay_ns * 1e-9)
+            return
+        window_ns = self.spin_window_ns
+        if delay_ns > window_ns:
+            time.sleep((delay_ns - window_ns) * 1e-9)
+        # sleep(0) releases the GIL on every pass so the gaze follower, audio
+        # and web threads keep running during the spin
+        while time.monotonic_ns() < target_ns:
+            time.sleep(0)
+
+    # ---------------- Servo output ----------------
+    def _apply_axis(
+        self,
+        batch: Dict[str, float],
+        name: str,
+        key: str,
+        enabled: bool,
+        angle: float,
+        override: Optional[float],
+        log_debug: bool,
+    ) -> None:
+        """One servo of a timeline frame: gaze override if any, else the timeline angle."""
+        if enabled and override is not None:
+            angle = override
+        self._last_target[key] = angle
+        if enabled:
+            # held poses are filtered by the controller's per-channel duty cache
+            batch[name] = angle
+        elif log_debug:
+            servo_logger.log_servo_command(name, angle, enabled=False)
+
     # ---------------- Channels control ----------------
+    @property
+    def channels(self) -> Dict[str, bool]:
+        return {
+            "eye_left": self._ch_eye_left,
+            "eye_right": self._ch_eye_right,
+            "neck": self._ch_neck,
+            "jaw": self._ch_jaw,
+        }
+
+    @channels.setter
+    def channels(self, flags: Dict[str, bool]) -> None:
+        # web_app assigns the shared flags dict directly
+        self.set_channels(flags)
+
     def set_channels(self, flags: Dict[str, bool]) -> None:
+        # the lock only serializes writers; the loops read the bools directly
         with self._lock:
-            old_channels = self.channels.copy()
             for k in ("eye_left", "eye_right", "neck", "jaw"):
-                if k in flags:
-                    self.channels[k] = bool(flags[k])
-
-            # Logger les changements de canaux
-            for k in ("eye_left", "eye_right", "neck", "jaw"):
-                if old_channels[k] != self.channels[k]:
-                    status = "ENABLED" if self.channels[k] else "DISABLED"
+                if k not in flags:
+                    continue
+                attr = f"_ch_{k}"
+                enabled = bool(flags[k])
+                if getattr(self, attr) != enabled:
+                    setattr(self, attr, enabled)
+                    # Logger les changements de canaux
+                    status = "ENABLED" if enabled else "DISABLED"
                     servo_logger.logger.info(f"CHANNEL_{status} | {k}")
 
     def set_on_track_finished(self, callback: Optional[Callable[[str, Optional[str], Optional[str]], None]]):
@@ -205,6 +348,8 @@ class SyncPlayer:
         au centre et on ajuste progressivement pour maintenir la personne au centre.
         """
         SLEEP = 0.02
+        # frozen-channel and centering traces only cost anything at DEBUG level
+        log_debug = servo_logger.logger.isEnabledFor(logging.DEBUG)
 
         # Paramètres de contrôle PID simplifié (Proportionnel seulement)
         KP_NECK = (
@@ -220,7 +365,18 @@ class SyncPlayer:
         MAX_SPEED_NECK = 15.0
         MAX_SPEED_EYES = 60.0
 
-        last_time = time.time()
+        # Un axe par ligne : clé gaze, servo, clé _last_target, attribut canal,
+        # gain, zone morte, vitesse max, butées hardware (selon rpi_hardware.py), tag
+        AXES = (
+            ("neck", "neck_pan", "neck", "_ch_neck",
+             KP_NECK, DEADZONE_NECK, MAX_SPEED_NECK, 0.0, 180.0, "NECK"),
+            ("eyeL", "eye_left", "eye_left", "_ch_eye_left",
+             KP_EYES, DEADZONE_EYES, MAX_SPEED_EYES, 60.0, 120.0, "EYEL"),
+            ("eyeR", "eye_right", "eye_right", "_ch_eye_right",
+             KP_EYES, DEADZONE_EYES, MAX_SPEED_EYES, 60.0, 120.0, "EYER"),
+        )
+
+        last_time = time.monotonic()
 
         while self._gaze_thread_running.is_set():
             try:
@@ -230,124 +386,49 @@ class SyncPlayer:
 
                 cmd = self.gaze.get_command()
                 if cmd and self.track_enable and cmd.get("mode", "") == "track":
-                    current_time = time.time()
+                    current_time = time.monotonic()
                     dt = current_time - last_time
                     last_time = current_time
 
-                    with self._lock:
-                        ch = self.channels.copy()
-
                     try:
                         # Les angles du gaze_server représentent la POSITION de la personne
                         # par rapport au centre. Pour centrer, on doit bouger dans la direction opposée.
-
-                        # neck - centrage horizontal
-                        if ch.get("neck", True) and "neck" in cmd:
-                            neck_data = cmd["neck"]
-                            if "yaw_deg" in neck_data:
-                                # L'erreur est l'angle actuel de la personne par rapport au centre
-                                error_deg = float(neck_data["yaw_deg"])
-
-                                # Si erreur < deadzone, ne pas bouger
-                                if abs(error_deg) > DEADZONE_NECK:
-                                    # Commande proportionnelle : bouger dans la direction opposée à l'erreur
-                                    correction_deg = -error_deg * KP_NECK
-
-                                    # Limiter la vitesse de correction
-                                    max_correction = MAX_SPEED_NECK * dt
-                                    correction_deg = max(
-                                        -max_correction,
-                                        min(max_correction, correction_deg),
-                                    )
-
-                                    # Position cible = position actuelle + correction
-                                    current_neck = self._last_target.get("neck", 90.0)
-                                    target_neck = current_neck + correction_deg
-
-                                    # Limites hardware (selon rpi_hardware.py)
-                                    target_neck = max(0.0, min(180.0, target_neck))
-
-                                    self.hw.set_named_angle(
-                                        "neck_pan", target_neck, log_enabled=True
-                                    )
-                                    self._last_target["neck"] = target_neck
-
-                                    servo_logger.logger.debug(
-                                        f"CENTERING_NECK | Error: {error_deg:.1f}° | Correction: {correction_deg:.1f}° | Target: {target_neck:.1f}°"
-                                    )
-                        else:
-                            servo_logger.log_servo_command(
-                                "neck_pan", self._last_target["neck"], enabled=False
-                            )
-
-                        # eyes - centrage horizontal (même logique)
-                        if ch.get("eye_left", True) and "eyeL" in cmd:
-                            eyeL_data = cmd["eyeL"]
-                            if "yaw_deg" in eyeL_data:
-                                error_deg = float(eyeL_data["yaw_deg"])
-
-                                if abs(error_deg) > DEADZONE_EYES:
-                                    correction_deg = -error_deg * KP_EYES
-                                    max_correction = MAX_SPEED_EYES * dt
-                                    correction_deg = max(
-                                        -max_correction,
-                                        min(max_correction, correction_deg),
-                                    )
-
-                                    current_eyeL = self._last_target.get(
-                                        "eye_left", 90.0
-                                    )
-                                    target_eyeL = current_eyeL + correction_deg
-                                    target_eyeL = max(
-                                        60.0, min(120.0, target_eyeL)
-                                    )  # Limites yeux
-
-                                    self.hw.set_named_angle(
-                                        "eye_left", target_eyeL, log_enabled=True
-                                    )
-                                    self._last_target["eye_left"] = target_eyeL
-
-                                    servo_logger.logger.debug(
-                                        f"CENTERING_EYEL | Error: {error_deg:.1f}° | Target: {target_eyeL:.1f}°"
+                        for (key, name, target_key, ch_attr, kp, deadzone,
+                             max_speed, lo, hi, tag) in AXES:
+                            if not (getattr(self, ch_attr) and key in cmd):
+                                if log_debug:
+                                    servo_logger.log_servo_command(
+                                        name, self._last_target[target_key], enabled=False
                                     )
-                        else:
-                            servo_logger.log_servo_command(
-                                "eye_left", self._last_target["eye_left"], enabled=False
+                                continue
+
+                            data = cmd[key]
+                            if "yaw_deg" not in data:
+                                continue
+                            # L'erreur est l'angle actuel de la personne par rapport au centre
+                            error_deg = float(data["yaw_deg"])
+
+                            # Si erreur < deadzone, ne pas bouger
+                            if abs(error_deg) <= deadzone:
+                                continue
+
+                            # Commande proportionnelle, vitesse de correction limitée
+                            max_correction = max_speed * dt
+                            correction_deg = max(
+                                -max_correction, min(max_correction, -error_deg * kp)
                             )
 
-                        if ch.get("eye_right", True) and "eyeR" in cmd:
-                            eyeR_data = cmd["eyeR"]
-                            if "yaw_deg" in eyeR_data:
-                                error_deg = float(eyeR_data["yaw_deg"])
-
-                                if abs(error_deg) > DEADZONE_EYES:
-                                    correction_deg = -error_deg * KP_EYES
-                                    max_correction = MAX_SPEED_EYES * dt
-                                    correction_deg = max(
-                                        -max_correction,
-                                        min(max_correction, correction_deg),
-                                    )
+                            # Position cible = position actuelle + correction, dans les butées
+                            target = self._last_target.get(target_key, 90.0) + correction_deg
+                            target = max(lo, min(hi, target))
 
-                                    current_eyeR = self._last_target.get(
-                                        "eye_right", 90.0
-                                    )
-                                    target_eyeR = current_eyeR + correction_deg
-                                    target_eyeR = max(60.0, min(120.0, target_eyeR))
+                            self.hw.set_named_angle(name, target, log_enabled=True)
+                            self._last_target[target_key] = target
 
-                                    self.hw.set_named_angle(
-                                        "eye_right", target_eyeR, log_enabled=True
-                                    )
-                                    self._last_target["eye_right"] = target_eyeR
-
-                                    servo_logger.logger.debug(
-                                        f"CENTERING_EYER | Error: {error_deg:.1f}° | Target: {target_eyeR:.1f}°"
-                                    )
-                        else:
-                            servo_logger.log_servo_command(
-                                "eye_right",
-                                self._last_target["eye_right"],
-                                enabled=False,
-                            )
+                            if log_debug:
+                                servo_logger.logger.debug(
+                                    f"CENTERING_{tag} | Error: {error_deg:.1f}° | Correction: {correction_deg:.1f}° | Target: {target:.1f}°"
+                                )
 
                     except Exception as e:
                         servo_logger.logger.warning(f"CENTERING_ERROR | {e}")
@@ -355,7 +436,7 @@ class SyncPlayer:
                         continue
                 else:
                     # Pas de commande gaze - retour lent vers neutre
-                    last_time = time.time()
+                    last_time = time.monotonic()
                     time.sleep(SLEEP)
                     continue
 
@@ -374,151 +455,98 @@ class SyncPlayer:
         error_message: Optional[str] = None
         frame_count = 0
         skipped_frames = 0
+        # frozen-channel traces only at DEBUG level
+        log_debug = servo_logger.logger.isEnabledFor(logging.DEBUG)
+        # gaze overrides, re-parsed only when a new packet arrives
+        gaze_seq = -1
+        gaze_axes: Optional[tuple] = None
 
         try:
             start_pos_ms = getattr(self, "_resume_from_ms", 0)
             self._stop_reason = None
 
+            # resume plays a zero-copy view of the PCM, cut on a frame boundary
+            # (same offset as AudioSegment slicing, without copying the tail)
+            audio = self.audio
+            start_byte = (start_pos_ms * audio.frame_rate // 1000) * audio.frame_width
+            self._play_obj = sa.play_buffer(
+                self._audio_pcm[start_byte:],
+                num_channels=audio.channels,
+                bytes_per_sample=audio.sample_width,
+                sample_rate=audio.frame_rate,
+            )
             if start_pos_ms:
-                segment = self.audio[start_pos_ms:]
-                self._play_obj = sa.play_buffer(
-                    segment.raw_data,
-                    num_channels=segment.channels,
-                    bytes_per_sample=segment.sample_width,
-                    sample_rate=segment.frame_rate,
-                )
                 servo_logger.logger.info(f"AUDIO_RESUME | From: {start_pos_ms/1000.0:.3f}s")
             else:
-                self._play_obj = sa.play_buffer(
-                    self.audio.raw_data,
-                    num_channels=self.audio.channels,
-                    bytes_per_sample=self.audio.sample_width,
-                    sample_rate=self.audio.frame_rate,
-                )
                 servo_logger.logger.info("AUDIO_START | From beginning")
 
             servo_logger.start_audio()
 
-            now = time.time()
-            if start_pos_ms:
-                self._start_time = now - (start_pos_ms / 1000.0)
-            else:
-                self._start_time = now
+            self._start_ns = time.monotonic_ns() - start_pos_ms * 1_000_000
             self._running.set()
             self._paused.clear()
+            self._resume_evt.set()
             if hasattr(self, "_resume_from_ms"):
                 delattr(self, "_resume_from_ms")
 
-            frames = self.timeline.frames
-            total_frames = len(frames)
+            ts_ns = self._ts_ns
+            angles = self._angles
+            total_frames = len(ts_ns)
             frame_idx = 0
-            RESYNC_THRESHOLD = 0.05  # seconds of tolerable drift before fast-forward
+            RESYNC_THRESHOLD_NS = 50_000_000  # tolerable drift before fast-forward
 
             while frame_idx < total_frames:
-                frame = frames[frame_idx]
-
-                while self._paused.is_set() and self._running.is_set():
-                    time.sleep(0.01)
-                    self._start_time += 0.01
+                if self._paused.is_set() and self._running.is_set():
+                    # parked until resume()/stop() (resume restarts the runner
+                    # from the pause position, so no timebase shift is needed)
+                    self._resume_evt.wait()
                 if not self._running.is_set():
                     finish_reason = self._stop_reason or "stopped"
                     break
 
-                target_time = self._start_time + frame["timestamp_ms"] / 1000.0
-                now = time.time()
-                delay = target_time - now
+                target_ns = self._start_ns + ts_ns[frame_idx]
+                delay_ns = target_ns - time.monotonic_ns()
 
-                if delay < -RESYNC_THRESHOLD:
-                    behind = -delay
-                    current_ms = max(0, int((time.time() - self._start_time) * 1000))
-                    new_idx = frame_idx
-                    while (new_idx + 1) < total_frames and frames[new_idx + 1]["timestamp_ms"] <= current_ms:
-                        new_idx += 1
+                if delay_ns < -RESYNC_THRESHOLD_NS:
+                    behind = -delay_ns * 1e-9
+                    current_ns = max(0, time.monotonic_ns() - self._start_ns)
+                    new_idx = self._resync_index(frame_idx, current_ns)
                     if new_idx != frame_idx:
                         skipped = new_idx - frame_idx
                         skipped_frames += skipped
                         frame_idx = new_idx
-                        frame = frames[frame_idx]
-                        target_time = self._start_time + frame["timestamp_ms"] / 1000.0
-                        now = time.time()
-                        delay = target_time - now
+                        target_ns = self._start_ns + ts_ns[frame_idx]
+                        delay_ns = target_ns - time.monotonic_ns()
                         servo_logger.logger.warning(
                             f"TIMING_RESYNC | drift={behind:.3f}s | skipped={skipped} | total_skipped={skipped_frames}"
                         )
 
-                if delay > 0:
-                    time.sleep(delay)
-
-                tgt = {
-                    "jaw": float(frame["jaw_deg"]),
-                    "neck": float(frame["neck_pan_deg"]),
-                    "eye_left": float(frame["eye_left_deg"]),
-                    "eye_right": float(frame["eye_right_deg"]),
-                }
-                self._last_target.update(tgt)
+                if delay_ns > 0:
+                    self._sleep_until_ns(target_ns, delay_ns)
 
-                with self._lock:
-                    ch = self.channels.copy()
+                # servo commands of this frame, written in one block by set_many
+                batch: Dict[str, float] = {}
 
-                gaze_cmd = None
+                gaze = None
                 if self.track_enable:
-                    gaze_cmd = self.gaze.get_command()
-
-                if ch.get("jaw", True):
-                    self.hw.set_named_angle("jaw", tgt["jaw"], log_enabled=True)
-                else:
-                    servo_logger.log_servo_command("jaw", self._last_target["jaw"], enabled=False)
-
-                if gaze_cmd and gaze_cmd.get("mode") == "track" and ch.get("neck", True):
-                    try:
-                        neck_angle = float(gaze_cmd["neck"]["yaw_deg"])
-                        self.hw.set_named_angle("neck_pan", neck_angle, log_enabled=True)
-                        self._last_target["neck"] = neck_angle
-                    except Exception as e:
-                        servo_logger.logger.warning(f"GAZE_OVERRIDE_NECK_ERROR | {e}")
-                        if ch.get("neck", True):
-                            self.hw.set_named_angle("neck_pan", tgt["neck"], log_enabled=True)
-                        else:
-                            servo_logger.log_servo_command("neck_pan", self._last_target["neck"], enabled=False)
-                else:
-                    if ch.get("neck", True):
-                        self.hw.set_named_angle("neck_pan", tgt["neck"], log_enabled=True)
-                    else:
-                        servo_logger.log_servo_command("neck_pan", self._last_target["neck"], enabled=False)
-
-                if gaze_cmd and gaze_cmd.get("mode") == "track" and ch.get("eye_left", True):
-                    try:
-                        eyeL_angle = float(gaze_cmd["eyeL"]["yaw_deg"])
-                        self.hw.set_named_angle("eye_left", eyeL_angle, log_enabled=True)
-                        self._last_target["eye_left"] = eyeL_angle
-                    except Exception as e:
-                        servo_logger.logger.warning(f"GAZE_OVERRIDE_EYEL_ERROR | {e}")
-                        if ch.get("eye_left", True):
-                            self.hw.set_named_angle("eye_left", tgt["eye_left"], log_enabled=True)
-                        else:
-                            servo_logger.log_servo_command("eye_left", self._last_target["eye_left"], enabled=False)
-                else:
-                    if ch.get("eye_left", True):
-                        self.hw.set_named_angle("eye_left", tgt["eye_left"], log_enabled=True)
-                    else:
-                        servo_logger.log_servo_command("eye_left", self._last_target["eye_left"], enabled=False)
-
-                if gaze_cmd and gaze_cmd.get("mode") == "track" and ch.get("eye_right", True):
-                    try:
-                        eyeR_angle = float(gaze_cmd["eyeR"]["yaw_deg"])
-                        self.hw.set_named_angle("eye_right", eyeR_angle, log_enabled=True)
-                        self._last_target["eye_right"] = eyeR_angle
-                    except Exception as e:
-                        servo_logger.logger.warning(f"GAZE_OVERRIDE_EYER_ERROR | {e}")
-                        if ch.get("eye_right", True):
-                            self.hw.set_named_angle("eye_right", tgt["eye_right"], log_enabled=True)
-                        else:
-                            servo_logger.log_servo_command("eye_right", self._last_target["eye_right"], enabled=False)
-                else:
-                    if ch.get("eye_right", True):
-                        self.hw.set_named_angle("eye_right", tgt["eye_right"], log_enabled=True)
-                    else:
-                        servo_logger.log_servo_command("eye_right", self._last_target["eye_right"], enabled=False)
+                    seq, gaze_cmd = self.gaze.get_snapshot()
+                    if gaze_cmd is not None:
+                        if seq != gaze_seq:
+                            gaze_seq = seq
+                            gaze_axes = _parse_gaze_axes(gaze_cmd)
+                        gaze = gaze_axes
+                neck_gaze, eyeL_gaze, eyeR_gaze = gaze or _NO_GAZE
+
+                # jaw is never overridden by gaze
+                jaw, neck, eye_l, eye_r = angles[frame_idx]
+                apply = self._apply_axis
+                apply(batch, "jaw", "jaw", self._ch_jaw, jaw, None, log_debug)
+                apply(batch, "neck_pan", "neck", self._ch_neck, neck, neck_gaze, log_debug)
+                apply(batch, "eye_left", "eye_left", self._ch_eye_left, eye_l, eyeL_gaze, log_debug)
+                apply(batch, "eye_right", "eye_right", self._ch_eye_right, eye_r, eyeR_gaze, log_debug)
+
+                if batch:
+                    self.hw.set_many(batch)
 
                 frame_count += 1
                 frame_idx += 1
@@ -587,9 +615,10 @@ class SyncPlayer:
 
     def pause(self):
         if self._running.is_set() and not self._paused.is_set():
+            self._resume_evt.clear()
             self._paused.set()
             # compute current audio position (timeline elapsed)
-            self._pause_pos_ms = int((time.time() - self._start_time) * 1000)
+            self._pause_pos_ms = (time.monotonic_ns() - self._start_ns) // 1_000_000
             servo_logger.logger.info(
                 f"PLAYBACK_PAUSE | Position: {self._pause_pos_ms/1000.0:.3f}s"
             )
@@ -607,9 +636,11 @@ class SyncPlayer:
             )
             # restart worker thread at resume position
             if self._thread and self._thread.is_alive():
-                # let current thread exit cleanly
+                # let current thread exit cleanly (wake it after clearing _running)
                 self._running.clear()
+                self._resume_evt.set()
                 self._thread.join()
+            self._resume_evt.set()
             self._running.set()
             self._thread = threading.Thread(target=self._runner, daemon=True)
             self._thread.start()
@@ -621,6 +652,7 @@ class SyncPlayer:
 
         self._running.clear()
         self._paused.clear()
+        self._resume_evt.set()
 
         if self._play_obj:
             try:
@@ -646,8 +678,10 @@ class SyncPlayer:
             "channels": dict(self.channels),
             "track_enable": bool(self.track_enable),
         }
-        if self._running.is_set():
-            st["elapsed_ms"] = int((time.time() - self._start_time) * 1000)
+        if self._paused.is_set():
+            st["elapsed_ms"] = self._pause_pos_ms
+        elif self._running.is_set():
+            st["elapsed_ms"] = (time.monotonic_ns() - self._start_ns) // 1_000_000
         # Diagnostics gaze
         cmd = self.gaze.get_command()
         if cmd:
@@ -0,0 +1,78 @@
+"""
+Tests purement Python : aucun accès I2C ni audio.
+
+Les modules matériels (board, busio, adafruit_pca9685) sont toujours
+remplacés par des doublures, même sur le Pi, pour que les tests ne
+pilotent jamais les vrais servos. pydub / simpleaudio ne sont simulés
+que s'ils ne sont pas installés.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+class FakeI2CDevice:
+    """Enregistre chaque transaction I2C (octets écrits)."""
+
+    def __init__(self):
+        self.writes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, buf, start=0, end=None):
+        self.writes.append(bytes(buf[start:end]))
+
+
+class FakePCA9685:
+    def __init__(self, i2c, address=0x40):
+        self.i2c_device = FakeI2CDevice()
+        self.frequency = 0
+
+    def deinit(self):
+        pass
+
+
+def _install_hardware_fakes():
+    board = types.ModuleType("board")
+    board.SCL, board.SDA = 3, 2
+    busio = types.ModuleType("busio")
+    busio.I2C = lambda scl, sda, frequency=100_000: object()
+    pca = types.ModuleType("adafruit_pca9685")
+    pca.PCA9685 = FakePCA9685
+    sys.modules.update(board=board, busio=busio, adafruit_pca9685=pca)
+
+
+def _install_audio_fakes():
+    try:
+        import pydub  # noqa: F401
+    except ImportError:
+        pydub = types.ModuleType("pydub")
+        pydub.AudioSegment = type("AudioSegment", (), {})
+        sys.modules["pydub"] = pydub
+    try:
+        import simpleaudio  # noqa: F401
+    except ImportError:
+        sa = types.ModuleType("simpleaudio")
+        sa.PlayObject = type("PlayObject", (), {})
+        sys.modules["simpleaudio"] = sa
+
+
+_install_hardware_fakes()
+_install_audio_fakes()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cwd(tmp_path, monkeypatch):
+    # logs/, caches et fichiers relatifs écrits par les tests restent hors du dépôt
+    monkeypatch.chdir(tmp_path)
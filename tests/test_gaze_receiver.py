@@ -0,0 +1,91 @@
+import json
+import time
+
+import pytest
+
+import gaze_receiver
+from gaze_receiver import _BIN_STRUCT, GazeReceiver, _decode, _expiry
+
+
+def _packet(mode=1, ts=1000.0, ttl_ms=250, target_id=7, version=1):
+    return _BIN_STRUCT.pack(
+        b"GZ", version, mode, ts, ttl_ms, target_id, 10.0, -5.5, 3.25, 0.0
+    )
+
+
+@pytest.fixture
+def receiver():
+    # Pas de bind UDP : le protocole est simulé en écrivant le slot directement
+    gr = GazeReceiver(autostart=False)
+    gr.running.set()
+    return gr
+
+
+def _receive(gr, data):
+    gr._seq += 1
+    gr.latest = (data, gr._seq)
+
+
+def test_binary_packet_decodes_like_json():
+    msg = _decode(_packet())
+    assert msg == {
+        "ts": 1000.0,
+        "ttl_ms": 250,
+        "mode": "track",
+        "target_id": 7,
+        "neck": {"yaw_deg": 10.0},
+        "eyeL": {"yaw_deg": -5.5},
+        "eyeR": {"yaw_deg": 3.25},
+    }
+    assert _expiry(msg) == pytest.approx(1000.25)
+
+
+def test_binary_packet_idle_without_target():
+    msg = _decode(_packet(mode=0, target_id=-1))
+    assert msg["mode"] == "idle"
+    assert msg["target_id"] is None
+
+
+def test_binary_packet_unknown_mode_and_version():
+    assert _decode(_packet(mode=9))["mode"] == ""
+    with pytest.raises(ValueError):
+        _decode(_packet(version=2))
+
+
+def test_json_packet_passthrough():
+    payload = {"mode": "track", "neck": {"yaw_deg": 1.0}}
+    assert _decode(json.dumps(payload).encode()) == payload
+    # sans 'ts' la commande ne périme jamais
+    assert _expiry(payload) == float("inf")
+
+
+def test_snapshot_decodes_only_newest(receiver, monkeypatch):
+    calls = []
+    real_decode = gaze_receiver._decode
+
+    def counting_decode(data):
+        calls.append(data)
+        return real_decode(data)
+
+    monkeypatch.setattr(gaze_receiver, "_decode", counting_decode)
+    now = time.time()
+    for neck in range(5):
+        _receive(receiver, json.dumps({"ts": now, "neck": {"yaw_deg": neck}}).encode())
+    seq, cmd = receiver.get_snapshot()
+    assert (seq, cmd["neck"]["yaw_deg"]) == (5, 4)
+    receiver.get_snapshot()
+    assert len(calls) == 1
+
+
+def test_snapshot_keeps_last_valid_command(receiver):
+    _receive(receiver, _packet(ts=time.time(), ttl_ms=5000))
+    receiver.get_snapshot()
+    _receive(receiver, b"not json")
+    seq, cmd = receiver.get_snapshot()
+    assert seq == 2 and cmd["target_id"] == 7
+
+
+def test_snapshot_expired_command(receiver):
+    _receive(receiver, _packet(ts=time.time() - 10.0))
+    assert receiver.get_snapshot() == (1, None)
+    assert receiver.get_command() is None
@@ -0,0 +1,111 @@
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from logger import ServoCommandBuffer, ServoLogger
+
+
+def test_buffer_grows_without_losing_commands():
+    buf = ServoCommandBuffer(capacity=2)
+    for i in range(5):
+        buf.append(100.0 + i, i * 0.5, "jaw" if i % 2 else "neck_pan", i, i != 3)
+    assert len(buf) == 5
+    assert buf.timestamps.tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert buf.elapsed.tolist() == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert buf.angles.dtype == np.float32
+    assert buf.angles.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert buf.enabled.tolist() == [True, True, True, False, True]
+    assert buf.servo_names == ["neck_pan", "jaw"]
+    assert buf.servo_ids.tolist() == [0, 1, 0, 1, 0]
+
+
+def test_buffer_clear_keeps_servo_ids():
+    buf = ServoCommandBuffer()
+    buf.append(0.0, 0.0, "jaw", 1.0, True)
+    buf.clear()
+    assert len(buf) == 0 and buf.timestamps.size == 0
+    buf.append(0.0, 0.0, "eye_left", 1.0, True)
+    buf.append(0.0, 0.0, "jaw", 1.0, True)
+    assert buf.servo_ids.tolist() == [1, 0]
+
+
+def test_snapshot_columns_share_one_length():
+    buf = ServoCommandBuffer(capacity=4)
+    buf.append(0.0, 0.0, "jaw", 1.0, True)
+    snap = buf.snapshot()
+    buf.append(1.0, 1.0, "neck_pan", 2.0, False)
+    assert len(snap) == 1
+    assert snap.servo_names == ["jaw"]
+    for column in (snap.elapsed, snap.angles, snap.enabled, snap.servo_ids):
+        assert column.shape == (1,)
+
+
+def test_stats_while_appending(tmp_path):
+    servo_log = ServoLogger(log_dir=str(tmp_path))
+    servo_log.session_start_time = 1.0
+    servo_log.audio_start_time = 1.0
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set() and i < 50_000:
+            servo_log.servo_commands.append(1.0, i * 1e-3, "jaw", 90.0, i % 2 == 0)
+            i += 1
+
+    # bascules de thread fréquentes : l'écrivain s'intercale entre les colonnes
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    thread = threading.Thread(target=writer)
+    try:
+        thread.start()
+        for _ in range(100):
+            stats = servo_log._calculate_stats(session_end_time=2.0)
+            counts = stats["servo_stats"].get("jaw", {"active": 0, "frozen": 0})
+            assert counts["active"] + counts["frozen"] == stats["total_commands"]
+    finally:
+        stop.set()
+        thread.join()
+        sys.setswitchinterval(previous)
+
+
+@pytest.fixture
+def servo_log(tmp_path):
+    return ServoLogger(log_dir=str(tmp_path))
+
+
+def test_session_stats(servo_log):
+    servo_log.current_session = "demo"
+    servo_log.session_start_time = 1.0
+    servo_log.audio_start_time = 10.0
+    servo_log.audio_duration = 1.5
+    servo_log.last_servo_command_time = 12.0
+    for elapsed, name, enabled in [
+        (0.0, "jaw", True),
+        (0.5, "jaw", True),
+        (1.0, "neck_pan", False),
+        (2.0, "jaw", False),
+    ]:
+        servo_log.servo_commands.append(10.0 + elapsed, elapsed, name, 90.0, enabled)
+
+    stats = servo_log._calculate_stats(session_end_time=13.0)
+
+    assert stats["total_session_duration"] == 12.0
+    assert stats["total_commands"] == 4
+    assert stats["actual_audio_duration"] == 2.0
+    assert stats["audio_drift"] == pytest.approx(0.5)
+    assert stats["last_servo_delay"] == pytest.approx(0.5)
+    assert stats["commands_per_second"] == pytest.approx(2.0)
+    assert stats["servo_stats"] == {
+        "jaw": {"active": 2, "frozen": 1},
+        "neck_pan": {"active": 0, "frozen": 1},
+    }
+
+
+def test_session_stats_without_commands(servo_log):
+    servo_log.current_session = "empty"
+    servo_log.session_start_time = 5.0
+    stats = servo_log._calculate_stats(session_end_time=6.0)
+    assert stats["total_commands"] == 0
+    assert stats["servo_stats"] == {}
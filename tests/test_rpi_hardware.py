@@ -0,0 +1,176 @@
+import time
+from dataclasses import replace
+
+import pytest
+
+from rpi_hardware import (
+    _ALL_CHANNELS_OFF,
+    _LED0_ON_L,
+    _PWM_REGS,
+    Hardware,
+    PCA9685Controller,
+    _pwm_regs,
+)
+
+
+@pytest.fixture
+def ctrl():
+    return PCA9685Controller(frequency=50)
+
+
+@pytest.fixture
+def hw():
+    hw = Hardware()
+    yield hw
+    hw.cleanup()
+
+
+def _float_duty(pulse_us: float, frequency: int = 50) -> int:
+    return int(pulse_us / (1_000_000.0 / frequency) * 0xFFFF)
+
+
+def test_set_duties_single_auto_increment_write(ctrl):
+    dev = ctrl._dev
+    dev.writes.clear()
+    ctrl.set_duties(1, [0x1000, 0x2000])
+    expected = (
+        bytes((_LED0_ON_L + 4,))
+        + _PWM_REGS.pack(0, 0x0100)
+        + _PWM_REGS.pack(0, 0x0200)
+    )
+    assert dev.writes == [expected]
+    ctrl.set_duties(1, [0x1000, 0x2000])
+    assert len(dev.writes) == 1
+
+
+def test_duty_lut_matches_float_formula(hw):
+    for name, spec in hw.SPECS.items():
+        lut = hw._duty_lut[name]
+        steps = hw.LUT_STEPS_PER_DEG
+        assert len(lut) == int(round((spec.max_deg - spec.min_deg) * steps)) + 1
+        for i, duty in enumerate(lut):
+            pulse = int(spec.angle_to_us(spec.min_deg + i / steps))
+            assert 0 <= duty - _float_duty(pulse) <= 1
+
+
+@pytest.mark.parametrize(
+    "duty, regs",
+    [
+        (0, (0, 0x1000)),
+        (0x000F, (0, 0x1000)),
+        (0x0010, (0, 0x0001)),
+        (0x8000, (0, 0x0800)),
+        (0xFFFE, (0, 0x0FFF)),
+        (0xFFFF, (0x1000, 0)),
+    ],
+)
+def test_pwm_regs_encoding(duty, regs):
+    assert _pwm_regs(duty) == regs
+
+
+def test_clamp_and_duty_clamps_and_maps_nan_to_max(hw):
+    spec, deg, duty = hw._clamp_and_duty("jaw", 500.0)
+    assert deg == spec.max_deg and duty == hw._duty_lut["jaw"][-1]
+    _, deg, duty = hw._clamp_and_duty("jaw", -500.0)
+    assert deg == spec.min_deg and duty == hw._duty_lut["jaw"][0]
+    _, deg, _ = hw._clamp_and_duty("jaw", float("nan"))
+    assert deg == spec.max_deg
+
+
+def test_set_duty_writes_register_block_once(ctrl):
+    dev = ctrl._dev
+    dev.writes.clear()
+    ctrl.set_duty(3, 0x8000)
+    ctrl.set_duty(3, 0x8000)
+    assert dev.writes == [bytes((_LED0_ON_L + 12,)) + _PWM_REGS.pack(0, 0x0800)]
+    ctrl.set_duty(3, 0x8000, force=True)
+    assert len(dev.writes) == 2
+
+
+def test_hardware_off_drops_pending(hw):
+    with hw._pending_lock:
+        hw._pending[2] = 1234
+    hw.off()
+    assert hw._pending == [-1] * 16
+    assert hw.ctrl._dev.writes[-1] == _ALL_CHANNELS_OFF
+
+
+def test_writer_counts_i2c_errors(hw):
+    def boom(*args, **kwargs):
+        raise OSError("bus")
+
+    dev = hw.ctrl._dev
+    dev.write = boom
+    try:
+        hw.set_named_angle("jaw", 150, log_enabled=False)
+        deadline = time.monotonic() + 2.0
+        while hw.i2c_errors == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        del dev.write  # bus rétabli avant cleanup()
+    assert hw.i2c_errors == 1
+    assert hw.ctrl._last_duty == [-1] * 16
+
+
+@pytest.mark.parametrize("frequency", [50, 60, 333])
+def test_us_to_duty_matches_float_formula(frequency):
+    ctrl = PCA9685Controller(frequency=frequency)
+    period = int(1_000_000 / frequency)
+    for pulse in range(0, period + 1, 7):
+        # Q16 arrondi supérieur : au plus un pas 16 bits au-dessus du flottant
+        assert 0 <= ctrl.us_to_duty(pulse) - _float_duty(pulse, frequency) <= 1
+
+
+def test_us_to_duty_clamps_to_period(ctrl):
+    assert ctrl.us_to_duty(-5) == 0
+    assert ctrl.us_to_duty(20_000) == 0xFFFF
+    assert ctrl.us_to_duty(1e9) == 0xFFFF
+
+
+def test_us_to_duty_truncates_fractional_us(ctrl):
+    assert ctrl.us_to_duty(1500.9) == ctrl.us_to_duty(1500)
+
+
+def test_off_writes_all_channels_and_forgets_cache(ctrl):
+    ctrl.set_duty(0, 0x4000)
+    ctrl.off()
+    assert ctrl._dev.writes[-1] == _ALL_CHANNELS_OFF
+    n = len(ctrl._dev.writes)
+    ctrl.set_duty(0, 0x4000)
+    assert len(ctrl._dev.writes) == n + 1
+
+
+def _neutral_duties(hw):
+    return {
+        hw.SPECS[name].channel: hw._clamp_and_duty(name, deg)[2]
+        for name, deg in hw.NEUTRAL_ANGLES.items()
+    }
+
+
+def _block(start, duties):
+    return bytes((_LED0_ON_L + 4 * start,)) + b"".join(
+        _PWM_REGS.pack(*_pwm_regs(d)) for d in duties
+    )
+
+
+def test_neutral_is_one_block_on_default_wiring(hw):
+    duties = _neutral_duties(hw)
+    hw.ctrl._dev.writes.clear()
+    hw.neutral()
+    assert hw.ctrl._dev.writes == [_block(0, [duties[ch] for ch in range(4)])]
+
+
+def test_neutral_follows_remapped_channels(monkeypatch):
+    spec = Hardware.SPECS["neck_pan"]
+    monkeypatch.setitem(Hardware.SPECS, "neck_pan", replace(spec, channel=7))
+    hw = Hardware()
+    try:
+        duties = _neutral_duties(hw)
+        hw.ctrl._dev.writes.clear()
+        hw.neutral()
+        assert hw.ctrl._dev.writes == [
+            _block(0, [duties[0], duties[1], duties[2]]),
+            _block(7, [duties[7]]),
+        ]
+    finally:
+        hw.cleanup()
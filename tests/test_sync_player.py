@@ -0,0 +1,106 @@
+import pytest
+
+import sync_player
+from sync_player import SyncPlayer
+from timeline import Timeline
+
+
+def _frame(ts_ms, jaw, neck=90.0, eye_l=90, eye_r=90):
+    return {
+        "timestamp_ms": ts_ms,
+        "jaw_deg": jaw,
+        "neck_pan_deg": neck,
+        "eye_left_deg": eye_l,
+        "eye_right_deg": eye_r,
+    }
+
+
+def _parsed(frames):
+    # Pas de Hardware : seul le pré-calcul de la timeline est testé
+    player = SyncPlayer.__new__(SyncPlayer)
+    player.timeline = Timeline(frames, duration=0.0)
+    player._parse_frames()
+    return player
+
+
+def test_parse_frames_converts_ms_to_ns_and_floats():
+    player = _parsed([_frame(0, 180), _frame(16, "170.5", eye_l=80)])
+    assert player._ts_ns == [0, 16_000_000]
+    assert player._angles == [(180.0, 90.0, 90.0, 90.0), (170.5, 90.0, 80.0, 90.0)]
+    assert all(type(a) is float for a in player._angles[1])
+
+
+def test_parse_frames_sorts_stably():
+    player = _parsed([_frame(20, 1), _frame(0, 2), _frame(20, 3), _frame(10, 4)])
+    assert player._ts_ns == [0, 10_000_000, 20_000_000, 20_000_000]
+    # timestamps égaux : ordre du fichier conservé
+    assert [a[0] for a in player._angles] == [2.0, 4.0, 1.0, 3.0]
+
+
+def test_parse_frames_empty_timeline():
+    player = _parsed([])
+    assert player._ts_ns == [] and player._angles == []
+
+
+@pytest.mark.parametrize(
+    "current_ms, expected_idx",
+    [(0, 0), (15, 0), (16, 1), (40, 2), (1000, 3)],
+)
+def test_resync_index_is_last_due_frame(current_ms, expected_idx):
+    # fichier désordonné : le rattrapage doit viser la bonne frame après tri
+    player = _parsed([_frame(48, 4), _frame(16, 2), _frame(0, 1), _frame(33, 3)])
+    idx = player._resync_index(0, current_ms * 1_000_000)
+    assert idx == expected_idx
+    assert player._angles[idx][0] == float(expected_idx + 1)
+
+
+def test_resync_never_moves_backwards():
+    player = _parsed([_frame(0, 1), _frame(16, 2), _frame(33, 3)])
+    assert player._resync_index(2, 0) == 2
+
+
+class _Clock:
+    """Horloge simulée : time.sleep avance monotonic_ns."""
+
+    def __init__(self):
+        self.now_ns = 0
+        self.sleeps = []
+
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now_ns += max(1_000, int(seconds * 1e9))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(sync_player.time, "monotonic_ns", clock.monotonic_ns)
+    monkeypatch.setattr(sync_player.time, "sleep", clock.sleep)
+    return clock
+
+
+def _timed_player(high_precision):
+    player = SyncPlayer.__new__(SyncPlayer)
+    player.high_precision_timing = high_precision
+    player.spin_window_ns = 2_000_000
+    return player
+
+
+def test_plain_sleep_by_default(clock, monkeypatch):
+    monkeypatch.delenv("SKULL_HIGH_PRECISION_TIMING", raising=False)
+    assert sync_player._env_high_precision_timing() is False
+    _timed_player(False)._sleep_until_ns(10_000_000, 10_000_000)
+    assert clock.sleeps == [pytest.approx(0.01)]
+
+
+def test_high_precision_sleeps_then_spins(clock, monkeypatch):
+    monkeypatch.setenv("SKULL_HIGH_PRECISION_TIMING", "on")
+    assert sync_player._env_high_precision_timing() is True
+    _timed_player(True)._sleep_until_ns(10_000_000, 10_000_000)
+    # sommeil jusqu'à la fenêtre, puis sleep(0) jusqu'à l'échéance
+    assert clock.sleeps[0] == pytest.approx(0.008)
+    assert set(clock.sleeps[1:]) == {0}
+    assert clock.now_ns >= 10_000_000
@@ -15,17 +15,22 @@ MODIFIÉ: Support du nom de scène personnalisé pour les uploads.
 
 from __future__ import annotations
 
+import atexit
+import functools
+import hashlib
 import json
 import os
 import random
 import re
 import shutil
 import shlex
+import signal
 import subprocess
 import tempfile
 import time
 import traceback
 import threading
+from concurrent.futures import Future
 from itertools import count
 from pathlib import Path
 from urllib.error import HTTPError, URLError
@@ -39,14 +44,22 @@ from flask import (
     jsonify,
     Response,
 )
+from flask.json.provider import DefaultJSONProvider
 
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 from pydub import AudioSegment
 from sync_player import SyncPlayer
 from loop_player import LoopPlayer
+from background_loop import call_later, get_background_loop
 from logger import servo_logger
 
+# orjson (optionnel) : encodage JSON en C pour jsonify et les fichiers de config
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 CONFIG_DIR = Path("config")
@@ -70,9 +83,35 @@ ACCUEIL_WEBHOOK_TIMEOUT = float(
 )
 
 app = Flask(__name__, static_folder="static", template_folder="templates")
+
+if orjson is not None:
+
+    class _OrJSONProvider(DefaultJSONProvider):
+        """jsonify() through orjson; falls back to Flask's encoder on odd types."""
+
+        def dumps(self, obj, **kwargs) -> str:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+            except TypeError:
+                return super().dumps(obj, **kwargs)
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = _OrJSONProvider(app)
 player = SyncPlayer()
 loop_player = LoopPlayer(LOOP_AUDIO_DIR)
 
+# Serveur waitress : pool de SKULL_WEB_THREADS threads. Chaque client
+# /logs/stream (SSE) garde un thread tant qu'il est connecté ; au-delà de
+# SKULL_LOG_STREAMS flux simultanés on répond 503 pour que les requêtes de
+# contrôle gardent toujours des threads libres (garder STREAMS < THREADS).
+SKULL_WEB_THREADS = max(1, int(os.environ.get("SKULL_WEB_THREADS", "8")))
+SKULL_LOG_STREAMS = max(
+    0, min(int(os.environ.get("SKULL_LOG_STREAMS", "2")), SKULL_WEB_THREADS - 1)
+)
+_log_stream_slots = threading.BoundedSemaphore(max(1, SKULL_LOG_STREAMS))
+
 VOLUME_TIMEOUT = float(os.environ.get("PLAYLIST_VOLUME_TIMEOUT", "5"))
 VOLUME_STEP = int(os.environ.get("PLAYLIST_VOLUME_STEP", "8"))
 VOLUME_MAX = int(os.environ.get("PLAYLIST_VOLUME_MAX", "127"))
@@ -94,9 +133,12 @@ _SESSION_CATEGORY_DEFAULTS = {
 }
 _session_categories_lock = threading.Lock()
 _session_categories_cache: Optional[dict[str, Any]] = None
+_session_categories_version = 0
 _esp32_button_assignments_lock = threading.Lock()
 
 _bt_last_reconnect_attempt: float = 0.0
+_bt_reconnect_failures: int = 0
+_bt_next_reconnect_delay: float = 0.0
 
 _ANSI_RE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
 
@@ -110,6 +152,10 @@ BT_DEVICE_ADDR = os.environ.get("PLAYLIST_BT_DEVICE_ADDR", "").strip().upper()
 BT_RECONNECT_INTERVAL = max(
     0.0, float(os.environ.get("PLAYLIST_BT_RECONNECT_INTERVAL", "10"))
 )
+BT_RECONNECT_MAX_INTERVAL = max(
+    BT_RECONNECT_INTERVAL,
+    float(os.environ.get("PLAYLIST_BT_RECONNECT_MAX_INTERVAL", "300")),
+)
 _DEFAULT_RESTART_CMD = "sudo systemctl restart servo-sync.service"
 _SERVICE_RESTART_RAW = os.environ.get(
     "PLAYLIST_SERVICE_RESTART_CMD", _DEFAULT_RESTART_CMD
@@ -312,6 +358,23 @@ def _ensure_bt_connection(address: str) -> bool:
     return False
 
 
+def _bt_reset_reconnect_backoff() -> None:
+    global _bt_reconnect_failures, _bt_next_reconnect_delay
+    _bt_reconnect_failures = 0
+    _bt_next_reconnect_delay = BT_RECONNECT_INTERVAL
+
+
+def _bt_bump_reconnect_backoff() -> None:
+    """Exponential backoff with jitter between failed reconnects, capped."""
+    global _bt_reconnect_failures, _bt_next_reconnect_delay
+    _bt_reconnect_failures += 1
+    ceiling = min(
+        BT_RECONNECT_MAX_INTERVAL,
+        BT_RECONNECT_INTERVAL * (2 ** min(_bt_reconnect_failures, 16)),
+    )
+    _bt_next_reconnect_delay = random.uniform(BT_RECONNECT_INTERVAL, ceiling)
+
+
 def _pick_transport_path() -> tuple[str | None, subprocess.CompletedProcess]:
     proc = _bluetoothctl_script("menu transport", "list")
     text = (proc.stdout or "") + "\n" + (proc.stderr or "")
@@ -504,6 +567,15 @@ class PlaylistManager:
         self._lock = threading.Lock()
         self._queue: list[dict[str, Any]] = []
         self._id_seq = count(1)
+        # Copy-on-write view for readers, rebound after every mutation
+        self._view: tuple[dict[str, Any], ...] = ()
+        # Bumped on every mutation; used as the /playlist ETag
+        self.version = 0
+
+    def _publish_locked(self) -> None:
+        # View first, then version: a reader never sees a new tag with an old view
+        self._view = tuple(self._queue)
+        self.version += 1
 
     def add(self, session: str) -> tuple[dict[str, Any], int]:
         with self._lock:
@@ -514,17 +586,20 @@ class PlaylistManager:
                 "retries": 0,
             }
             self._queue.append(item)
+            self._publish_locked()
             return item.copy(), len(self._queue)
 
     def snapshot(self) -> list[dict[str, Any]]:
-        with self._lock:
-            return [item.copy() for item in self._queue]
+        # Lock-free: _view is an immutable tuple rebound by writers, and queued
+        # dicts are never mutated in place (pop/push_front copy them).
+        return [item.copy() for item in self._view]
 
     def pop_next(self) -> Optional[dict[str, Any]]:
         with self._lock:
             if not self._queue:
                 return None
             item = self._queue.pop(0)
+            self._publish_locked()
             return item.copy()
 
     def remove(self, item_id: int) -> Optional[dict[str, Any]]:
@@ -532,6 +607,7 @@ class PlaylistManager:
             for idx, item in enumerate(self._queue):
                 if item["id"] == item_id:
                     removed = self._queue.pop(idx)
+                    self._publish_locked()
                     return removed.copy()
         return None
 
@@ -545,7 +621,9 @@ class PlaylistManager:
                     removed.append(item.copy())
                 else:
                     kept.append(item)
-            self._queue = kept
+            if removed:
+                self._queue = kept
+                self._publish_locked()
         return removed
 
     def move(self, item_id: int, offset: int) -> str:
@@ -557,29 +635,33 @@ class PlaylistManager:
                         return "noop"
                     self._queue.pop(idx)
                     self._queue.insert(new_idx, item)
+                    self._publish_locked()
                     return "moved"
         return "not_found"
 
     def push_front(self, item: dict[str, Any]) -> None:
         with self._lock:
             self._queue.insert(0, item.copy())
+            self._publish_locked()
 
     def clear(self) -> None:
         with self._lock:
             self._queue.clear()
+            self._publish_locked()
 
     def size(self) -> int:
-        with self._lock:
-            return len(self._queue)
+        return len(self._view)
 
     def has_items(self) -> bool:
-        with self._lock:
-            return bool(self._queue)
+        return bool(self._view)
 
 
 playlist = PlaylistManager()
-_current_entry_lock = threading.Lock()
+# Published by reference: the stored dict is a private copy and is never
+# mutated afterwards, so readers do not need a lock.
 _current_entry: Optional[dict[str, Any]] = None
+_current_entry_seq = count(1)
+_current_entry_version = 0
 
 
 # Keep ESP32 relay active for a brief window while the next track loads
@@ -591,16 +673,16 @@ _last_finish_reason: Optional[str] = None
 
 
 def _set_current_entry(entry: Optional[dict[str, Any]]) -> None:
-    global _current_entry
-    with _current_entry_lock:
-        _current_entry = entry.copy() if entry else None
+    global _current_entry, _current_entry_version
+    _current_entry = entry.copy() if entry else None
+    _current_entry_version = next(_current_entry_seq)  # next() is atomic
 
 
 def _get_current_entry() -> Optional[dict[str, Any]]:
-    with _current_entry_lock:
-        if _current_entry is None:
-            return None
-        return _current_entry.copy()
+    entry = _current_entry
+    if entry is None:
+        return None
+    return entry.copy()
 
 
 _random_lock = threading.Lock()
@@ -613,21 +695,26 @@ def _normalize_session_name(name: str) -> str:
     return name.strip().lower()
 
 
+@functools.lru_cache(maxsize=4)
+def _session_names_at(data_dir: str, mtime_ns: int) -> tuple[str, ...]:
+    # Keyed on the directory mtime: creating/deleting/renaming a session bumps it.
+    # Exceptions propagate, so a failed scan is never cached.
+    with os.scandir(data_dir) as it:
+        names = [entry.name for entry in it if entry.is_dir()]
+    names.sort(key=str.lower)
+    return tuple(names)
+
+
 def _list_session_names() -> list[str]:
     try:
-        entries = sorted(DATA_DIR.iterdir(), key=lambda p: p.name.lower())
+        mtime_ns = DATA_DIR.stat().st_mtime_ns
+        return list(_session_names_at(str(DATA_DIR), mtime_ns))
     except FileNotFoundError:
         return []
     except Exception as exc:
         servo_logger.logger.warning("SESSION_LIST_FAILED | error=%s", exc)
         return []
 
-    sessions: list[str] = []
-    for entry in entries:
-        if entry.is_dir():
-            sessions.append(entry.name)
-    return sessions
-
 
 def _eligible_random_sessions(additional_excludes: Iterable[str] = ()) -> list[str]:
     excluded = {_normalize_session_name(name) for name in _RANDOM_EXCLUDED_NAMES}
@@ -651,8 +738,8 @@ def _pick_random_session(additional_excludes: Iterable[str] = ()) -> Optional[st
 
 
 def _is_random_mode_enabled() -> bool:
-    with _random_lock:
-        return _random_enabled
+    # Plain bool read, atomic under the GIL; writers still hold _random_lock
+    return _random_enabled
 
 
 def _set_random_mode_enabled(enabled: bool) -> bool:
@@ -911,9 +998,18 @@ def _write_json_atomic(path: Path, payload: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     fd, tmp_name = tempfile.mkstemp(prefix=".pitch_tmp_", dir=str(path.parent))
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as handle:
-            json.dump(payload, handle, ensure_ascii=False, indent=2)
-        shutil.move(tmp_name, path)
+        if orjson is not None:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+                handle.flush()
+                os.fsync(handle.fileno())
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, ensure_ascii=False, indent=2)
+                handle.flush()
+                os.fsync(handle.fileno())
+        # Same directory: a single atomic rename(2)
+        os.replace(tmp_name, path)
     finally:
         try:
             if os.path.exists(tmp_name):
@@ -922,6 +1018,100 @@ def _write_json_atomic(path: Path, payload: dict) -> None:
             pass
 
 
+# Config writes triggered by the UI are coalesced: a burst of POSTs produces a
+# single write per file once the burst settles.
+CONFIG_WRITE_DELAY_S = 0.25
+_pending_config_writes: dict[Path, Callable[[], dict]] = {}
+_pending_config_lock = threading.Lock()
+_pending_config_timer: Optional[Future] = None
+_config_write_lock = threading.Lock()
+# Dernier échec d'écriture par fichier (effacé au prochain succès)
+_config_write_errors: dict[Path, str] = {}
+
+
+def _schedule_json_write(path: Path, snapshot: Callable[[], dict]) -> None:
+    """Persist snapshot() to path shortly; later calls for the same path replace it."""
+    global _pending_config_timer
+    with _pending_config_lock:
+        _pending_config_writes[path] = snapshot
+        if _pending_config_timer is None:
+            _pending_config_timer = call_later(
+                CONFIG_WRITE_DELAY_S, _flush_pending_config_writes
+            )
+
+
+def _take_pending_config_writes() -> dict[Path, Callable[[], dict]]:
+    global _pending_config_timer
+    with _pending_config_lock:
+        pending = dict(_pending_config_writes)
+        _pending_config_writes.clear()
+        _pending_config_timer = None
+    return pending
+
+
+def _write_pending_configs(pending: dict[Path, Callable[[], dict]]) -> None:
+    # Two flushes may overlap on executor threads; keep renames ordered.
+    with _config_write_lock:
+        for path, snapshot in pending.items():
+            try:
+                _write_json_atomic(path, snapshot())
+            except Exception as exc:
+                _config_write_errors[path] = str(exc)
+                servo_logger.logger.error(
+                    "CONFIG_WRITE_FAILED | path=%s | %s", path, exc, exc_info=True
+                )
+            else:
+                _config_write_errors.pop(path, None)
+
+
+def _save_json_config(path: Path, snapshot: Callable[[], dict]) -> None:
+    """
+    Coalesced write of an admin setting. While the last write of path has
+    failed, write synchronously instead so the error reaches the caller
+    (the route answers 500) rather than a silent success.
+    """
+    if path not in _config_write_errors:
+        _schedule_json_write(path, snapshot)
+        return
+    with _pending_config_lock:
+        _pending_config_writes.pop(path, None)
+    with _config_write_lock:
+        _write_json_atomic(path, snapshot())
+        _config_write_errors.pop(path, None)
+
+
+def _flush_pending_config_writes() -> None:
+    """Timer callback: hand the pending writes to the default executor.
+
+    Only the debounce timer lives on the background loop; write + fsync +
+    rename run on a worker thread so gaze datagrams and deferred callbacks
+    are never stalled behind disk I/O.
+    """
+    pending = _take_pending_config_writes()
+    if pending:
+        get_background_loop().run_in_executor(None, _write_pending_configs, pending)
+
+
+def _flush_config_writes_at_exit() -> None:
+    timer = _pending_config_timer
+    if timer is not None:
+        timer.cancel()
+    _write_pending_configs(_take_pending_config_writes())
+
+
+atexit.register(_flush_config_writes_at_exit)
+
+
+def _install_sigterm_flush() -> None:
+    """systemd arrête le service par SIGTERM, qui ne déclenche pas atexit."""
+
+    def _on_sigterm(signum, frame):
+        _flush_config_writes_at_exit()
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+
+
 def _load_session_categories_locked() -> dict[str, Any]:
     global _session_categories_cache
     if _session_categories_cache is None:
@@ -988,12 +1178,15 @@ def _save_session_categories_locked(
         if session_name and category_name:
             sanitized_sessions[session_name] = category_name
 
-    global _session_categories_cache
+    global _session_categories_cache, _session_categories_version
     _session_categories_cache = {
         "categories": unique_categories,
         "sessions": sanitized_sessions,
     }
-    _write_json_atomic(SESSION_CATEGORIES_PATH, _session_categories_cache)
+    _session_categories_version += 1
+    # The cache is authoritative; the file (fsync included) is written after
+    # the caller drops _session_categories_lock, from the latest snapshot.
+    _schedule_json_write(SESSION_CATEGORIES_PATH, _load_session_categories)
 
     return {
         "categories": list(unique_categories),
@@ -1527,9 +1720,12 @@ def _esp32_request(
         raise ESP32CommunicationError(str(exc)) from exc
 
 
+def _pitch_offsets_snapshot() -> dict:
+    return {name: spec.pitch_offset for name, spec in player.hw.SPECS.items()}
+
+
 def save_pitch_offsets() -> None:
-    offsets = {name: spec.pitch_offset for name, spec in player.hw.SPECS.items()}
-    _write_json_atomic(PITCH_CONFIG_PATH, offsets)
+    _save_json_config(PITCH_CONFIG_PATH, _pitch_offsets_snapshot)
 
 
 def load_pitch_offsets() -> None:
@@ -1557,7 +1753,7 @@ def load_pitch_offsets() -> None:
 
 
 def save_channel_flags() -> None:
-    _write_json_atomic(CHANNELS_CONFIG_PATH, player_channels)
+    _save_json_config(CHANNELS_CONFIG_PATH, lambda: dict(player_channels))
 
 
 def load_channel_flags() -> None:
@@ -1879,9 +2075,25 @@ def _sanitize_loop_filename(filename: str) -> str:
     return cleaned[:80]
 
 
+_index_page: Optional[tuple[bytes, str]] = None
+
+
 @app.route("/")
 def index():
-    return render_template("index.html")
+    # index.html has no per-request variables: render it once, then serve the
+    # bytes with an ETag so browsers revalidate instead of re-downloading.
+    global _index_page
+    if _index_page is None:
+        body = render_template("index.html").encode("utf-8")
+        _index_page = (body, hashlib.sha1(body).hexdigest())
+    body, etag = _index_page
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, mimetype="text/html")
+    resp.set_etag(etag)
+    resp.cache_control.no_cache = True
+    return resp
 
 
 @app.route("/favicon.ico")
@@ -2015,7 +2227,7 @@ def loop_upload():
         try:
             up_file.save(str(tmp_path))
             final_path = LOOP_AUDIO_DIR / safe_name
-            shutil.move(str(tmp_path), final_path)
+            os.replace(tmp_path, final_path)
         finally:
             if tmp_path.exists():
                 try:
@@ -2478,18 +2690,23 @@ def status():
             connected = info.get("connected") if info else None
             volume_percent: int | None = None
 
-            if connected is not True and BT_RECONNECT_INTERVAL > 0:
+            if connected is True:
+                _bt_reset_reconnect_backoff()
+            elif BT_RECONNECT_INTERVAL > 0:
                 global _bt_last_reconnect_attempt
                 now = time.time()
-                if now - _bt_last_reconnect_attempt >= BT_RECONNECT_INTERVAL:
+                if now - _bt_last_reconnect_attempt >= _bt_next_reconnect_delay:
                     _bt_last_reconnect_attempt = now
                     if _ensure_bt_connection(BT_DEVICE_ADDR):
+                        _bt_reset_reconnect_backoff()
                         info = _bluetooth_info(BT_DEVICE_ADDR)
                         connected = info.get("connected") if info else True
                     else:
+                        _bt_bump_reconnect_backoff()
                         servo_logger.logger.warning(
-                            "BTCTL_STATUS_RETRY_FAILED | address=%s",
+                            "BTCTL_STATUS_RETRY_FAILED | address=%s | next_in=%.1fs",
                             BT_DEVICE_ADDR,
+                            _bt_next_reconnect_delay,
                         )
 
             if info and info.get("connected") is True:
@@ -2510,7 +2727,7 @@ def status():
                 "address": BT_DEVICE_ADDR,
                 "connected": connected,
                 "last_attempt_ts": _bt_last_reconnect_attempt or None,
-                "retry_interval": BT_RECONNECT_INTERVAL,
+                "retry_interval": _bt_next_reconnect_delay or BT_RECONNECT_INTERVAL,
             }
             if volume_percent is not None:
                 st["bluetooth"]["volume_percent"] = volume_percent
@@ -2580,22 +2797,43 @@ def volume():
     return jsonify(response), status
 
 
+_playlist_view_cache: Optional[tuple[str, bytes]] = None
+
+
+def _playlist_view_response() -> Response:
+    """GET /playlist body, cached per state version and served with an ETag."""
+    global _playlist_view_cache
+    # Tag computed before the snapshot: at worst the body is newer than its tag
+    tag = (
+        f"{playlist.version}.{_current_entry_version}.{_session_categories_version}"
+    )
+    if request.if_none_match.contains(tag):
+        resp = Response(status=304)
+        resp.set_etag(tag)
+        return resp
+
+    cached = _playlist_view_cache
+    if cached is not None and cached[0] == tag:
+        body = cached[1]
+    else:
+        mapping = _load_session_categories()["sessions"]
+        body = app.json.dumps(
+            {
+                "current": _enrich_entry_with_category(_get_current_entry(), mapping),
+                "queue": _enrich_queue_with_categories(playlist.snapshot(), mapping),
+            }
+        ).encode("utf-8")
+        _playlist_view_cache = (tag, body)
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(tag)
+    return resp
+
+
 @app.route("/playlist", methods=["GET", "POST"])
 def playlist_api():
     try:
         if request.method == "GET":
-            categories_data = _load_session_categories()
-            mapping = categories_data["sessions"]
-            return jsonify(
-                {
-                    "current": _enrich_entry_with_category(
-                        _get_current_entry(), mapping
-                    ),
-                    "queue": _enrich_queue_with_categories(
-                        playlist.snapshot(), mapping
-                    ),
-                }
-            )
+            return _playlist_view_response()
 
         body = request.get_json(silent=True) or {}
         session = body.get("session")
@@ -3066,6 +3304,22 @@ def logs():
 @app.route("/logs/stream")
 def logs_stream():
     """Stream des logs en temps réel via Server-Sent Events"""
+    if SKULL_LOG_STREAMS <= 0 or not _log_stream_slots.acquire(blocking=False):
+        return (
+            jsonify(
+                {"error": "Trop de flux de logs ouverts", "limit": SKULL_LOG_STREAMS}
+            ),
+            503,
+            {"Retry-After": "5"},
+        )
+
+    released = threading.Event()
+
+    def release_slot():
+        # appelé par close() côté WSGI, même si le générateur n'a pas démarré
+        if not released.is_set():
+            released.set()
+            _log_stream_slots.release()
 
     def generate():
         log_file = servo_logger.get_latest_log_file()
@@ -3083,12 +3337,18 @@ def logs_stream():
                     line = f.readline()
                     if line:
                         yield f"data: {line.rstrip()}\n\n"
-                    else:
-                        time.sleep(0.1)  # Attendre nouvelles données
+                    elif not servo_logger.wait_for_write(1.0):
+                        # Réveil sur écriture du logger ; le timeout couvre
+                        # les écritures faites par un autre processus. Sur
+                        # timeout, un commentaire SSE fait remarquer au serveur
+                        # un client parti (son créneau est alors libéré).
+                        yield ": keepalive\n\n"
         except Exception as e:
             yield f"data: Error reading log: {e}\n\n"
 
-    return Response(generate(), mimetype="text/plain")
+    response = Response(generate(), mimetype="text/plain")
+    response.call_on_close(release_slot)
+    return response
 
 
 @app.route("/logs/stats")
@@ -3147,4 +3407,19 @@ if __name__ == "__main__":
     print("  - /logs/stream : Real-time log stream")
     print("  - /logs/stats  : Session statistics")
     print("  - /logs/download : Download log file")
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    try:
+        from waitress import serve
+    except ImportError:  # pragma: no cover - development fallback
+        serve = None
+    _install_sigterm_flush()
+    if serve is not None:
+        # Bounded worker pool; /logs/stream is capped at SKULL_LOG_STREAMS
+        serve(
+            app,
+            host="0.0.0.0",
+            port=5000,
+            threads=SKULL_WEB_THREADS,
+            connection_limit=200,
+        )
+    else:
+        app.run(host="0.0.0.0", port=5000, debug=True)